@@ -0,0 +1,336 @@
+"""
+End-to-end burst load harness for the dispatcher and the file handlers.
+
+Replays a burst of synthetic S3 upload events through the real handler code,
+with in-memory stand-ins for S3 and for asynchronous Lambda invocation. The
+Lambda stand-in shares a fixed concurrency limit between all functions and
+charges a simulated cold start whenever no warm container of a function is
+idle. Handlers run on threads, so absolute throughput is bounded by the GIL;
+use the numbers to compare routing modes and settings, not as AWS figures.
+
+Routing modes:
+    dispatcher  S3 event -> dispatcher -> CSV/JSON/Parquet handler
+    direct      S3 event -> handler (the per-suffix notifications in terraform)
+    queue       S3 events -> SQS batches -> queue_consumer
+
+Run from the repository root:
+    python -m benchmarks.load_harness --events 2000 --concurrency 50 --mode all
+"""
+import argparse
+import contextlib
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pyarrow as pa
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+from gdpr_obfuscator import csv_handler, dispatcher, json_handler, parquet_handler, queue_consumer, routing
+
+INPUT_BUCKET = 'obfuscator-tool-bucket'
+MODES = ('dispatcher', 'direct', 'queue')
+
+
+class LocalS3:
+    """
+    Thread-safe in-memory stand-in for the S3 calls the handlers make, with
+    an optional fixed latency per request.
+    """
+
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def put_object(self, Bucket, Key, Body):
+        self._wait()
+        with self._lock:
+            self.objects[(Bucket, Key)] = Body if isinstance(Body, bytes) else Body.encode('utf-8')
+        return {}
+
+    def get_object(self, Bucket, Key, Range=None):
+        self._wait()
+        with self._lock:
+            if (Bucket, Key) not in self.objects:
+                raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found'}}, 'GetObject')
+            body = self.objects[(Bucket, Key)]
+        if Range:
+            start, end = (int(part) for part in Range.replace('bytes=', '').split('-'))
+            body = body[start:end + 1]
+        return {'Body': io.BytesIO(body)}
+
+    def head_object(self, Bucket, Key):
+        self._wait()
+        with self._lock:
+            return {'ContentLength': len(self.objects[(Bucket, Key)])}
+
+
+class LocalLambda:
+    """
+    Stand-in for lambda_client.invoke with InvocationType='Event'.
+
+    Invocations queue for a worker from a pool of `concurrency` threads
+    shared by all functions. Each function keeps its own pool of warm
+    containers; starting without an idle one sleeps for `cold_start_ms`.
+    """
+
+    def __init__(self, functions, concurrency, cold_start_ms, on_complete):
+        self.functions = functions
+        self.cold_start = cold_start_ms / 1000
+        self.on_complete = on_complete
+        self.cold_starts = 0
+        self.invocations = 0
+        self.peak_concurrency = 0
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._idle_containers = {name: 0 for name in functions}
+        self._running = 0
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def invoke(self, FunctionName, InvocationType='Event', Payload='{}'):
+        if FunctionName not in self.functions:
+            raise ClientError(
+                {'Error': {'Code': 'ResourceNotFoundException', 'Message': FunctionName}}, 'Invoke'
+            )
+        with self._lock:
+            self._outstanding += 1
+            self.invocations += 1
+        self._executor.submit(self._run, FunctionName, json.loads(Payload))
+        return {'StatusCode': 202}
+
+    def _run(self, function_name, event):
+        with self._lock:
+            self._running += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._running)
+            cold = self._idle_containers[function_name] == 0
+            if cold:
+                self.cold_starts += 1
+            else:
+                self._idle_containers[function_name] -= 1
+        if cold:
+            time.sleep(self.cold_start)
+
+        try:
+            try:
+                result = self.functions[function_name](event, None)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            self.on_complete(function_name, event, result, error)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._idle_containers[function_name] += 1
+                self._outstanding -= 1
+                self._idle.notify_all()
+
+    def wait_until_idle(self):
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
+        self._executor.shutdown()
+
+
+def build_file(file_format, rows):
+    records = [
+        {'name': f"Person {i}", 'email': f"person{i}@example.com", 'amount': i}
+        for i in range(rows)
+    ]
+    if file_format == 'csv':
+        lines = ['name,email,amount'] + [f"{r['name']},{r['email']},{r['amount']}" for r in records]
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+    if file_format == 'json':
+        return json.dumps(records).encode('utf-8')
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(records), buffer)
+    return buffer.getvalue()
+
+
+def s3_event(key, pii_fields):
+    return {
+        'Records': [{'s3': {'bucket': {'name': INPUT_BUCKET}, 'object': {'key': key}}}],
+        'pii_fields': pii_fields,
+    }
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_burst(mode='dispatcher', events=1000, concurrency=50, cold_start_ms=250,
+              rows=20, formats=('csv', 'json', 'parquet'), batch_size=10, s3_latency_ms=5,
+              pii_fields=('name', 'email')):
+    """
+    Uploads synthetic files, fires one S3 event per file at once and waits
+    for every resulting handler invocation to finish.
+
+    Returns:
+        dict: Latency percentiles in milliseconds, throughput, error rate,
+            invocation and cold start counts for the run.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown routing mode: {mode}")
+
+    local_s3 = LocalS3(latency_ms=s3_latency_ms)
+    bodies = {file_format: build_file(file_format, rows) for file_format in formats}
+    keys = [f"load/{i}.{formats[i % len(formats)]}" for i in range(events)]
+    for key in keys:
+        local_s3.objects[(INPUT_BUCKET, key)] = bodies[routing.get_file_extension(key)]
+
+    emitted = {}
+    latencies = []
+    errors = []
+    results_lock = threading.Lock()
+
+    def record(keys_done, error=None):
+        finished = time.perf_counter()
+        with results_lock:
+            for key in keys_done:
+                if error is not None:
+                    errors.append((key, str(error)))
+                else:
+                    latencies.append((finished - emitted[key]) * 1000)
+
+    def on_complete(function_name, event, result, error):
+        if function_name == 'dispatcher':
+            # A successful dispatch finishes when its handler does.
+            if error is None and result['statusCode'] == 202:
+                return
+            record([event['Records'][0]['s3']['object']['key']], error or result['body'])
+        elif function_name == 'queue_consumer':
+            failed = set() if error else {item['itemIdentifier'] for item in result['batchItemFailures']}
+            for message in event['Records']:
+                message_keys = [file[1] for file in queue_consumer.parse_message(message['body'])]
+                message_error = error or ('batch item failure' if message['messageId'] in failed else None)
+                record(message_keys, message_error)
+        else:
+            key = event['file_name'] if 'file_name' in event else event['Records'][0]['s3']['object']['key']
+            record([key], error)
+
+    functions = {
+        'dispatcher': dispatcher.lambda_handler,
+        'csv_processor': csv_handler.lambda_handler,
+        'json_processor': json_handler.lambda_handler,
+        'parquet_processor': parquet_handler.lambda_handler,
+        'queue_consumer': queue_consumer.lambda_handler,
+    }
+    local_lambda = LocalLambda(functions, concurrency, cold_start_ms, on_complete)
+
+    with contextlib.ExitStack() as stack:
+        for module in (csv_handler, json_handler, parquet_handler):
+            stack.enter_context(patch.object(module, 's3', local_s3))
+        stack.enter_context(patch.object(dispatcher, 'lambda_client', local_lambda))
+        # One file at a time per consumer invocation, so queue mode uses the
+        # same number of concurrent workers as the other modes.
+        stack.enter_context(patch.dict('os.environ', {'PII_FIELDS': ','.join(pii_fields), 'QUEUE_MAX_WORKERS': '1'}))
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        start = time.perf_counter()
+        if mode == 'queue':
+            for batch_start in range(0, events, batch_size):
+                batch = keys[batch_start:batch_start + batch_size]
+                now = time.perf_counter()
+                emitted.update({key: now for key in batch})
+                records = [
+                    {'messageId': key, 'body': json.dumps(s3_event(key, list(pii_fields)))}
+                    for key in batch
+                ]
+                local_lambda.invoke('queue_consumer', Payload=json.dumps({'Records': records}))
+        else:
+            for key in keys:
+                emitted[key] = time.perf_counter()
+                if mode == 'dispatcher':
+                    target = 'dispatcher'
+                else:
+                    target = f"{routing.get_file_extension(key)}_processor"
+                try:
+                    local_lambda.invoke(target, Payload=json.dumps(s3_event(key, list(pii_fields))))
+                except ClientError as e:
+                    record([key], e)
+        local_lambda.wait_until_idle()
+        elapsed = time.perf_counter() - start
+
+    completed = len(latencies)
+    return {
+        'mode': mode,
+        'events': events,
+        'concurrency': concurrency,
+        'completed': completed,
+        'errors': len(errors),
+        'error_rate': round(len(errors) / events, 4) if events else 0.0,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_per_second': round(completed / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            name: round(value, 1) if value is not None else None
+            for name, value in (
+                ('p50', percentile(latencies, 0.50)),
+                ('p95', percentile(latencies, 0.95)),
+                ('p99', percentile(latencies, 0.99)),
+                ('max', max(latencies) if latencies else None),
+            )
+        },
+        'invocations': local_lambda.invocations,
+        'cold_starts': local_lambda.cold_starts,
+        'peak_concurrency': local_lambda.peak_concurrency,
+        'sample_errors': errors[:5],
+    }
+
+
+def print_report(report):
+    # Latencies are None when no event completed, e.g. a run where every event failed.
+    latency = {name: '-' if value is None else value for name, value in report['latency_ms'].items()}
+    print(
+        f"{report['mode']:<11}{report['events']:>8}{report['concurrency']:>6}"
+        f"{report['throughput_per_second']:>10}{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}"
+        f"{report['error_rate']:>8.2%}{report['invocations']:>8}{report['cold_starts']:>7}"
+    )
+    for key, error in report['sample_errors']:
+        print(f"    {key}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=MODES + ('all',), default='all')
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50])
+    parser.add_argument('--cold-start-ms', type=float, default=250)
+    parser.add_argument('--rows', type=int, default=20, help="rows per synthetic file")
+    parser.add_argument('--formats', default='csv,json,parquet')
+    parser.add_argument('--batch-size', type=int, default=10, help="messages per batch in queue mode")
+    parser.add_argument('--s3-latency-ms', type=float, default=5)
+    parser.add_argument('--json', action='store_true', help="print full reports as JSON")
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == 'all' else (args.mode,)
+    if not args.json:
+        print(f"{'mode':<11}{'events':>8}{'conc':>6}{'ev/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'p99 ms':>9}{'errors':>8}{'invokes':>8}{'colds':>7}")
+    for concurrency in args.concurrency:
+        for mode in modes:
+            report = run_burst(
+                mode=mode,
+                events=args.events,
+                concurrency=concurrency,
+                cold_start_ms=args.cold_start_ms,
+                rows=args.rows,
+                formats=tuple(args.formats.split(',')),
+                batch_size=args.batch_size,
+                s3_latency_ms=args.s3_latency_ms,
+            )
+            if args.json:
+                print(json.dumps(report))
+            else:
+                print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Throughput benchmark for the column obfuscation kernels.
+
+Run from the repository root:
+    python -m benchmarks.masking_benchmark --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import pyarrow as pa
+from gdpr_obfuscator.obfuscation_utils import STRATEGIES
+from gdpr_obfuscator.token_vault import CachedTokenVault, SQLiteTokenVault, set_token_vault
+
+NOTES = [
+    "Customer called about order 1234, follow up next week",
+    "Contact jane.doe@example.com for the delivery slot",
+    "Left voicemail on +44 7700 900123, no answer",
+    "Address updated, postcode now SW1A 1AA",
+    "Refund issued to GB82 WEST 1234 5698 7654 32",
+]
+
+# Representative inputs for strategies that expect a particular format.
+SAMPLE_VALUES = {
+    'keep_last': ["4111111111111111", "5500005555555559", "340000000000009"],
+    'email': ["jane.doe@example.com", "j.smith@test.co.uk", "info@example.org"],
+    'truncate_date': ["2024-01-15", "2023-11-02T08:15:00", "2022-06-30"],
+    'tokenize': [f"customer{i}@example.com" for i in range(20_000)],
+}
+
+# Allowed slowdown of free-text scrubbing relative to whole-cell masking.
+SCRUB_MAX_RATIO = 10.0
+
+
+def build_column(rows, strategy):
+    values = SAMPLE_VALUES.get(strategy, NOTES)
+    return pa.array([values[i % len(values)] for i in range(rows)], type=pa.string())
+
+
+def time_kernel(kernel, values, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        kernel(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows, repeats):
+    timings = {}
+    for name, kernel in STRATEGIES.items():
+        timings[name] = time_kernel(kernel, build_column(rows, name), repeats)
+        print(f"{name:<16}{rows / timings[name]:>16,.0f} rows/s")
+
+    ratio = timings['scrub'] / timings['mask']
+    print(f"scrub/mask ratio: {ratio:.2f}x (limit {SCRUB_MAX_RATIO:.0f}x)")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault_dir:
+        set_token_vault(CachedTokenVault(SQLiteTokenVault(os.path.join(vault_dir, 'vault.db'))))
+        timings = run(args.rows, args.repeats)
+    if timings['scrub'] / timings['mask'] > SCRUB_MAX_RATIO:
+        raise SystemExit("scrub throughput is outside the allowed factor of mask")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+import csv
+import gzip
+import io
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import unquote_plus
+import boto3
+from botocore.exceptions import ClientError
+from gdpr_obfuscator.pii_detector import detect_pii_default
+from gdpr_obfuscator.profiling import profiled
+from gdpr_obfuscator.routing import process_object
+
+s3 = boto3.client('s3')
+
+DEFAULT_MAX_WORKERS = 8
+CHECKPOINT_EVERY = 100
+# Failures kept inline in the checkpoint and job summary; every failure is
+# also written to the job's failure log objects.
+MAX_INLINE_FAILURES = 100
+# Stop taking new entries once less than this much Lambda time remains.
+TIME_SAFETY_MARGIN_MS = 30_000
+
+
+def split_s3_uri(s3_uri):
+    no_prefix = s3_uri.replace('s3://', '')
+    bucket, key = no_prefix.split('/', 1)
+    return bucket, key
+
+
+def parse_manifest(content, manifest_key, source_bucket=None):
+    """
+    Parses a manifest into a list of (bucket, key) entries.
+
+    CSV manifests are read as S3 Inventory reports, whose first two columns
+    are the bucket and the URL-encoded key. Anything else is read as a key
+    list with one s3:// URI, or one key in `source_bucket`, per line.
+
+    Args:
+        content (str): The decoded manifest.
+        manifest_key (str): The manifest's object key, used to pick the format.
+        source_bucket (str, optional): Bucket for plain keys in a key list.
+
+    Returns:
+        list: (bucket, key) tuples in manifest order.
+    """
+    if manifest_key.removesuffix('.gz').endswith('.csv'):
+        return [
+            (row[0], unquote_plus(row[1]))
+            for row in csv.reader(io.StringIO(content))
+            if len(row) >= 2
+        ]
+
+    entries = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('s3://'):
+            entries.append(split_s3_uri(line))
+        elif source_bucket:
+            entries.append((source_bucket, line))
+        else:
+            raise ValueError(f"Manifest entry '{line}' has no bucket and no source_bucket was given.")
+    return entries
+
+
+def read_manifest(bucket, key, source_bucket=None):
+    body = s3.get_object(Bucket=bucket, Key=key)['Body'].read()
+    if key.endswith('.gz'):
+        body = gzip.decompress(body)
+    return parse_manifest(body.decode('utf-8'), key, source_bucket)
+
+
+def load_checkpoint(bucket, key):
+    """
+    Loads a saved checkpoint, or a fresh one if none exists yet.
+    """
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)['Body'].read()
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return {'next_index': 0, 'processed': 0, 'failed': 0, 'failures': [], 'elapsed_seconds': 0.0}
+        raise e
+    checkpoint = json.loads(body)
+    checkpoint.setdefault('failed', len(checkpoint['failures']))
+    return checkpoint
+
+
+def save_checkpoint(bucket, key, checkpoint):
+    s3.put_object(Bucket=bucket, Key=key, Body=json.dumps(checkpoint).encode('utf-8'))
+
+
+def failure_log_prefix(checkpoint_key):
+    return f"{checkpoint_key}.failures/"
+
+
+def save_failures(bucket, checkpoint_key, failures):
+    """
+    Appends failures to the job's failure log as a new object named after
+    the first failed index, so each checkpoint only writes its own failures.
+    Objects sort in manifest order.
+    """
+    key = f"{failure_log_prefix(checkpoint_key)}{failures[0]['index']:012d}.jsonl"
+    body = ''.join(json.dumps(failure) + '\n' for failure in failures)
+    s3.put_object(Bucket=bucket, Key=key, Body=body.encode('utf-8'))
+
+
+def run_manifest_job(entries, pii_fields, checkpoint_bucket, checkpoint_key,
+                     detect_pii=False, max_workers=DEFAULT_MAX_WORKERS,
+                     checkpoint_every=CHECKPOINT_EVERY, time_remaining_ms=None):
+    """
+    Obfuscates every manifest entry with a bounded worker pool, resuming from
+    and periodically saving a checkpoint.
+
+    The checkpoint records the index below which every entry has finished,
+    so a resumed job may redo a few in-flight entries but never skips one.
+    Reprocessing is safe because outputs are overwritten.
+
+    The checkpoint keeps a failure count and the first MAX_INLINE_FAILURES
+    failures; the full list is appended to JSON Lines objects under
+    '<checkpoint_key>.failures/', so checkpoint writes stay small however
+    many entries fail.
+
+    Args:
+        entries (list): (bucket, key) tuples from the manifest.
+        pii_fields (list | dict): Fields to obfuscate in every file.
+        checkpoint_bucket (str): Bucket holding the checkpoint object.
+        checkpoint_key (str): Key of the checkpoint object.
+        detect_pii (bool): Whether to also detect PII columns automatically.
+        max_workers (int): Maximum number of files processed concurrently.
+        checkpoint_every (int): Number of finished entries between checkpoints.
+        time_remaining_ms (callable, optional): Returns the remaining run time,
+            e.g. context.get_remaining_time_in_millis. New entries stop being
+            started once it drops below TIME_SAFETY_MARGIN_MS.
+
+    Returns:
+        dict: Summary of the run, including whether the manifest is complete.
+    """
+    checkpoint = load_checkpoint(checkpoint_bucket, checkpoint_key)
+    next_index = checkpoint['next_index']
+    start_index = next_index
+    elapsed_before = checkpoint['elapsed_seconds']
+    start = time.perf_counter()
+
+    pending = {}
+    # Outcomes of finished entries above next_index, keyed by index. They are
+    # only counted once every earlier entry has finished too.
+    finished = {}
+    since_checkpoint = 0
+    # Failures counted since the last checkpoint, not yet in the failure log.
+    new_failures = []
+    submit_index = next_index
+    out_of_time = False
+
+    def record_progress():
+        # The log is written first, so a crash in between only means the
+        # resumed run logs those failures again, never that they are lost.
+        if new_failures:
+            save_failures(checkpoint_bucket, checkpoint_key, new_failures)
+            inline_room = MAX_INLINE_FAILURES - len(checkpoint['failures'])
+            checkpoint['failures'].extend(new_failures[:max(inline_room, 0)])
+            new_failures.clear()
+        checkpoint['next_index'] = next_index
+        checkpoint['elapsed_seconds'] = elapsed_before + time.perf_counter() - start
+        save_checkpoint(checkpoint_bucket, checkpoint_key, checkpoint)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            if time_remaining_ms is not None and time_remaining_ms() < TIME_SAFETY_MARGIN_MS:
+                out_of_time = True
+            # Keep the amount of submitted work bounded to the pool size.
+            while not out_of_time and submit_index < len(entries) and len(pending) < max_workers:
+                bucket, key = entries[submit_index]
+                future = pool.submit(process_object, bucket, key, pii_fields, detect_pii)
+                pending[future] = submit_index
+                submit_index += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    future.result()
+                    finished[index] = None
+                except Exception as e:
+                    bucket, key = entries[index]
+                    print(f"Failed to obfuscate s3://{bucket}/{key}: {e}")
+                    finished[index] = str(e)
+
+            while next_index in finished:
+                error = finished.pop(next_index)
+                if error is None:
+                    checkpoint['processed'] += 1
+                else:
+                    bucket, key = entries[next_index]
+                    checkpoint['failed'] += 1
+                    new_failures.append({'index': next_index, 'file': f"s3://{bucket}/{key}", 'error': error})
+                next_index += 1
+                since_checkpoint += 1
+
+            if since_checkpoint >= checkpoint_every:
+                record_progress()
+                since_checkpoint = 0
+
+    record_progress()
+
+    run_seconds = time.perf_counter() - start
+    run_count = next_index - start_index
+    return {
+        'complete': next_index >= len(entries),
+        'total': len(entries),
+        'next_index': next_index,
+        'processed': checkpoint['processed'],
+        'failed': checkpoint['failed'],
+        'failures': checkpoint['failures'],
+        'failure_log': f"s3://{checkpoint_bucket}/{failure_log_prefix(checkpoint_key)}",
+        'run_seconds': round(run_seconds, 3),
+        'files_per_second': round(run_count / run_seconds, 2) if run_seconds else 0.0,
+        'total_seconds': round(checkpoint['elapsed_seconds'], 3),
+    }
+
+
+@profiled
+def lambda_handler(event, context):
+    """
+    Batch job entry point for obfuscating every object listed in a manifest.
+
+    Example event:
+        {
+            "manifest": "s3://my-bucket/manifests/erasure.csv",
+            "pii_fields": ["name", "email_address"],
+            "max_workers": 16
+        }
+
+    Invoke again with the same event to resume after a timeout or crash; the
+    response status is 202 while entries remain and 200 once complete.
+
+    Args:
+        event (dict): Job settings; `manifest` is required.
+        context (LambdaContext): Runtime information provided by AWS Lambda.
+    Returns:
+        dict: Response with status code and the JSON encoded job summary.
+    """
+    if 'manifest' not in event:
+        raise KeyError("Missing required input: 'manifest'")
+
+    manifest_bucket, manifest_key = split_s3_uri(event['manifest'])
+    checkpoint_bucket, checkpoint_key = split_s3_uri(
+        event.get('checkpoint', f"s3://{manifest_bucket}/{manifest_key}.checkpoint.json")
+    )
+    entries = read_manifest(manifest_bucket, manifest_key, event.get('source_bucket'))
+    print(f"Batch job for {len(entries)} manifest entries from {event['manifest']}")
+
+    summary = run_manifest_job(
+        entries,
+        pii_fields=event.get('pii_fields', []),
+        checkpoint_bucket=checkpoint_bucket,
+        checkpoint_key=checkpoint_key,
+        detect_pii=event.get('detect_pii', detect_pii_default()),
+        max_workers=event.get('max_workers', DEFAULT_MAX_WORKERS),
+        checkpoint_every=event.get('checkpoint_every', CHECKPOINT_EVERY),
+        time_remaining_ms=getattr(context, 'get_remaining_time_in_millis', None),
+    )
+    print("Batch job summary:", {key: value for key, value in summary.items() if key != 'failures'})
+
+    return {
+        'statusCode': 200 if summary['complete'] else 202,
+        'body': json.dumps(summary),
+    }
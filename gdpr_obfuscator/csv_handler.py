@@ -2,10 +2,14 @@ import boto3
 import pandas as pd
 from io import StringIO
 from botocore.exceptions import ClientError
+from gdpr_obfuscator.dry_run import dry_run_response
+from gdpr_obfuscator.obfuscation_utils import obfuscate_dataframe
+from gdpr_obfuscator.pii_detector import detect_pii_default, resolve_pii_fields
+from gdpr_obfuscator.profiling import profiled
 
 s3 = boto3.client('s3')
 
-def csv_processor(bucket, file_name, pii_fields):
+def csv_processor(bucket, file_name, pii_fields, detect_pii=False):
     print(f"CSV Handler called for file: {file_name} in bucket: {bucket}")
 
  
@@ -25,9 +29,9 @@ def csv_processor(bucket, file_name, pii_fields):
     if len(df.columns) == 1:
         raise ValueError(f"CSV file {file_name} is malformed — it appears to have all data in a single column.")
 
-    for field in pii_fields:
-        if field in df.columns:
-            df[field] = df[field].astype(str).apply(lambda x: "*" * len(x))
+    pii_fields = resolve_pii_fields(df, pii_fields, detect_pii)
+
+    obfuscate_dataframe(df, pii_fields)
 
 
     obfuscated_csv = df.to_csv(index=False)
@@ -38,6 +42,7 @@ def csv_processor(bucket, file_name, pii_fields):
 
     return {'statusCode': 200, 'body': 'CSV processed and uploaded to obfuscated-files-bucket'}
 
+@profiled
 def lambda_handler(event, context):
     pii_fields = event.get('pii_fields', [])
     print("PII Fields passed:", pii_fields)
@@ -46,6 +51,9 @@ def lambda_handler(event, context):
         s3_uri = event['file_to_obfuscate']
         no_prefix = s3_uri.replace('s3://', '')
         bucket, file_name = no_prefix.split('/', 1)
+    elif 'bucket' in event and 'file_name' in event:
+        bucket = event['bucket']
+        file_name = event['file_name']
     elif 'Records' in event:
         try:
             record = event['Records'][0]
@@ -57,4 +65,12 @@ def lambda_handler(event, context):
         raise KeyError("Missing required S3 input: 'file_to_obfuscate' or 'Records'")
 
 
-    return csv_processor(bucket=bucket, file_name=file_name, pii_fields=pii_fields)
+    if event.get('dry_run'):
+        return dry_run_response(bucket, file_name, pii_fields, event.get('detect_pii', detect_pii_default()))
+
+    return csv_processor(
+        bucket=bucket,
+        file_name=file_name,
+        pii_fields=pii_fields,
+        detect_pii=event.get('detect_pii', detect_pii_default()),
+    )
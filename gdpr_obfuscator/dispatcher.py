@@ -7,7 +7,10 @@ logger.setLevel(logging.INFO)
 s3 = boto3.client('s3')
 lambda_client = boto3.client('lambda')
 
-def invoke_main_lambda_handler(function_name, bucket, file_name):
+# Optional settings copied from the triggering event into the handler payload.
+FORWARDED_EVENT_KEYS = ('pii_fields', 'detect_pii', 'profile', 'dry_run')
+
+def invoke_main_lambda_handler(function_name, bucket, file_name, options=None):
     """
     Invokes the appropriate Lambda function to process the uploaded file.
 
@@ -15,6 +18,7 @@ Args:
     function_name (str): The name of the target Lambda function to invoke.
     bucket (str): The name of the S3 bucket containing the uploaded file.
     file_name (str): The key (path/filename) of the uploaded object in the bucket.
+    options (dict, optional): Extra settings such as pii_fields forwarded to the handler.
 
 Returns:
     dict: The response from the invoked Lambda function (invocation metadata, not the function's execution result).
@@ -23,6 +27,8 @@ Returns:
         'bucket': bucket,
         'file_name': file_name
     }
+    if options:
+        payload.update(options)
     try:
         response = lambda_client.invoke(
             FunctionName=function_name,
@@ -71,17 +77,18 @@ def lambda_handler(event, context):
    
         file_extension = file_name.split('.')[-1].lower()
         logger.info("File Extension: %s", file_extension)
-        
+
+        options = {key: event[key] for key in FORWARDED_EVENT_KEYS if key in event}
 
         if file_extension == 'csv':
             logger.info("Routing to CSV processing function")
-            return invoke_main_lambda_handler('csv_processor', bucket, file_name)
+            return invoke_main_lambda_handler('csv_processor', bucket, file_name, options)
         elif file_extension == 'json':
             logger.info("Routing to JSON processing function")
-            return invoke_main_lambda_handler('json_processor', bucket, file_name)
+            return invoke_main_lambda_handler('json_processor', bucket, file_name, options)
         elif file_extension == 'parquet':
             logger.info("Routing to Parquet processing function")
-            return invoke_main_lambda_handler('parquet_processor', bucket, file_name)
+            return invoke_main_lambda_handler('parquet_processor', bucket, file_name, options)
         else:
             logger.warning(f"Unsupported file type: {file_extension}")
             return {
@@ -0,0 +1,265 @@
+import io
+import json
+import math
+import boto3
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from gdpr_obfuscator.obfuscation_utils import normalise_pii_fields
+from gdpr_obfuscator.pii_detector import detect_pii_columns
+
+s3 = boto3.client('s3')
+
+HEAD_BYTES = 64 * 1024
+MB = 1024 * 1024
+# Upper bound on the head read for CSVs whose header line (very wide tables)
+# does not fit in HEAD_BYTES.
+MAX_HEAD_BYTES = 16 * MB
+# Planning figures for a full run. Throughput is end to end (read, parse,
+# obfuscate, serialise); the memory multiplier is peak memory over file size
+# for the formats that are processed whole.
+PROCESSING_BYTES_PER_SECOND = {'csv': 20 * MB, 'json': 10 * MB, 'parquet': 40 * MB}
+MEMORY_MULTIPLIER = {'csv': 6, 'json': 8}
+BASE_MEMORY_MB = 100
+INVOCATION_OVERHEAD_SECONDS = 0.5
+# Suggested shard size for CSV and JSON files, which are processed whole.
+SHARD_BYTES = 256 * MB
+LAMBDA_MEMORY_SIZES_MB = (128, 256, 512, 1024, 2048, 3008, 4096, 6144, 8192, 10240)
+
+
+class S3RangeReader(io.RawIOBase):
+    """
+    Seekable read-only file over an S3 object that fetches only the byte
+    ranges actually read, so pyarrow can read a Parquet footer without
+    downloading the file.
+    """
+
+    def __init__(self, bucket, key, size):
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.position = 0
+        self.bytes_fetched = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.size + offset
+        return self.position
+
+    def readinto(self, buffer):
+        end = min(self.position + len(buffer), self.size)
+        if end <= self.position:
+            return 0
+        data = read_range(self.bucket, self.key, self.position, end - 1)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        self.bytes_fetched += len(data)
+        return len(data)
+
+
+def read_range(bucket, key, start, end):
+    response = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+    return response['Body'].read()
+
+
+def read_csv_head(bucket, key, size):
+    """
+    Reads the start of a CSV object, doubling the ranged read until it holds
+    the header and one complete row, the whole object or MAX_HEAD_BYTES.
+    """
+    head = read_range(bucket, key, 0, min(HEAD_BYTES, size) - 1) if size else b''
+    while head.count(b'\n') < 2 and len(head) < min(size, MAX_HEAD_BYTES):
+        end = min(2 * len(head), size, MAX_HEAD_BYTES)
+        head += read_range(bucket, key, len(head), end - 1)
+    if b'\n' not in head and len(head) < size:
+        raise ValueError(f"CSV header is longer than {MAX_HEAD_BYTES} bytes.")
+    return head
+
+
+def match_fields(pii_fields, available):
+    fields = list(normalise_pii_fields(pii_fields))
+    return (
+        [field for field in fields if field in available],
+        [field for field in fields if field not in available],
+    )
+
+
+def plan_csv(head, size):
+    if not head:
+        return pd.DataFrame(), 0, False
+    truncated = len(head) < size
+    if truncated:
+        head = head[:head.rfind(b'\n') + 1]
+    sample = pd.read_csv(io.BytesIO(head))
+    header_bytes = head.find(b'\n') + 1
+    bytes_per_row = (len(head) - header_bytes) / len(sample) if len(sample) else 0
+
+    if not truncated:
+        rows = len(sample)
+    else:
+        rows = int((size - header_bytes) / bytes_per_row) if bytes_per_row else None
+    return sample, rows, truncated
+
+
+def plan_json(head, size):
+    if not head:
+        return pd.DataFrame(), 0, False
+    text = head.decode('utf-8', errors='ignore').lstrip()
+    if not text.startswith('['):
+        raise ValueError("JSON file must contain a list of JSON objects.")
+
+    decoder = json.JSONDecoder()
+    records = []
+    position = 1
+    while True:
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+        if position >= len(text) or text[position] == ']':
+            break
+        try:
+            record, position = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            # The ranged read cut the last record short.
+            break
+        records.append(record)
+
+    truncated = len(head) < size
+    if not truncated:
+        rows = len(records)
+    else:
+        rows = int(size / (position / len(records))) if records else None
+    return pd.DataFrame(records), rows, truncated
+
+
+def _type_paths(prefix, data_type):
+    # Mirrors obfuscate_nested: struct fields add a path element, lists are
+    # stepped through, and maps lead to their values or to 'key'/'value'.
+    if pa.types.is_struct(data_type):
+        paths = set()
+        for i in range(data_type.num_fields):
+            field = data_type.field(i)
+            paths.add(f"{prefix}.{field.name}")
+            paths |= _type_paths(f"{prefix}.{field.name}", field.type)
+        return paths
+    if pa.types.is_list(data_type) or pa.types.is_large_list(data_type) or pa.types.is_fixed_size_list(data_type):
+        return _type_paths(prefix, data_type.value_type)
+    if pa.types.is_map(data_type):
+        return (
+            {f"{prefix}.key", f"{prefix}.value"}
+            | _type_paths(f"{prefix}.key", data_type.key_type)
+            | _type_paths(f"{prefix}.value", data_type.item_type)
+            | _type_paths(prefix, data_type.item_type)
+        )
+    return set()
+
+
+def nested_paths(parquet_file):
+    """
+    Field paths addressable in pii_fields, e.g. 'contacts.phone' for a
+    list<struct<phone>> column 'contacts', plus the top-level columns.
+    """
+    paths = set()
+    for field in parquet_file.schema_arrow:
+        paths.add(field.name)
+        paths |= _type_paths(field.name, field.type)
+    return paths
+
+
+def estimate_lambda_memory_mb(memory_mb):
+    for size in LAMBDA_MEMORY_SIZES_MB:
+        if size >= memory_mb:
+            return size
+    return LAMBDA_MEMORY_SIZES_MB[-1]
+
+
+def plan_file(bucket, file_name, pii_fields, detect_pii=False):
+    """
+    Plans an obfuscation run from the object's size and a small ranged read.
+
+    CSV and JSON plans read only the first HEAD_BYTES (more for CSVs whose
+    header does not fit); Parquet plans read only the footer metadata.
+    Nothing is written.
+
+    Args:
+        bucket (str): The bucket containing the object.
+        file_name (str): The object key.
+        pii_fields (list | dict): Fields that would be obfuscated.
+        detect_pii (bool): Whether to report columns auto-detection would add
+            (CSV and JSON only, from the sampled rows).
+
+    Returns:
+        dict: Matched and missing fields, row estimate, planned chunking,
+            estimated runtime and memory, and bytes read to make the plan.
+    """
+    file_extension = file_name.split('.')[-1].lower()
+    if file_extension not in PROCESSING_BYTES_PER_SECOND:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+    size = s3.head_object(Bucket=bucket, Key=file_name)['ContentLength']
+    plan = {'file': f"s3://{bucket}/{file_name}", 'format': file_extension, 'size_bytes': size}
+
+    if file_extension == 'parquet':
+        reader = S3RangeReader(bucket, file_name, size)
+        parquet_file = pq.ParquetFile(reader)
+        metadata = parquet_file.metadata
+        matched, missing = match_fields(pii_fields, nested_paths(parquet_file))
+        row_groups = [metadata.row_group(i) for i in range(metadata.num_row_groups)]
+        largest_row_group = max((group.total_byte_size for group in row_groups), default=0)
+        plan.update({
+            'rows': metadata.num_rows,
+            'rows_estimated': False,
+            'chunking': {
+                'strategy': 'row_groups',
+                'chunks': metadata.num_row_groups,
+                'rows_per_chunk': [group.num_rows for group in row_groups],
+            },
+            'estimated_memory_mb': math.ceil(BASE_MEMORY_MB + (size + 2 * largest_row_group) / MB),
+            'bytes_read': reader.bytes_fetched,
+        })
+    else:
+        if file_extension == 'csv':
+            head = read_csv_head(bucket, file_name, size)
+        else:
+            head = read_range(bucket, file_name, 0, HEAD_BYTES - 1) if size else b''
+        sample, rows, truncated = (plan_csv if file_extension == 'csv' else plan_json)(head, size)
+        matched, missing = match_fields(pii_fields, set(sample.columns))
+        if detect_pii:
+            plan['detected_fields'] = detect_pii_columns(sample)
+        plan.update({
+            'rows': rows,
+            'rows_estimated': truncated,
+            'chunking': {
+                'strategy': 'shards',
+                'chunks': max(1, math.ceil(size / SHARD_BYTES)),
+                'bytes_per_chunk': SHARD_BYTES,
+            },
+            'estimated_memory_mb': math.ceil(BASE_MEMORY_MB + size * MEMORY_MULTIPLIER[file_extension] / MB),
+            'bytes_read': len(head),
+        })
+
+    plan['matched_fields'] = matched
+    plan['missing_fields'] = missing
+    plan['estimated_runtime_seconds'] = round(
+        INVOCATION_OVERHEAD_SECONDS + size / PROCESSING_BYTES_PER_SECOND[file_extension], 2
+    )
+    plan['suggested_lambda_memory_mb'] = estimate_lambda_memory_mb(plan['estimated_memory_mb'])
+    return plan
+
+
+def dry_run_response(bucket, file_name, pii_fields, detect_pii=False):
+    plan = plan_file(bucket, file_name, pii_fields, detect_pii)
+    print("Dry run plan:", plan)
+    return {'statusCode': 200, 'body': json.dumps(plan)}
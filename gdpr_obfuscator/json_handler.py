@@ -2,11 +2,15 @@ import boto3
 import json
 import pandas as pd
 from botocore.exceptions import ClientError
+from gdpr_obfuscator.dry_run import dry_run_response
+from gdpr_obfuscator.obfuscation_utils import obfuscate_dataframe
+from gdpr_obfuscator.pii_detector import detect_pii_default, resolve_pii_fields
+from gdpr_obfuscator.profiling import profiled
 
 s3 = boto3.client('s3')
 
 
-def json_processor(bucket, file_name, pii_fields):
+def json_processor(bucket, file_name, pii_fields, detect_pii=False):
     print(f"JSON Handler called for file: {file_name} in bucket: {bucket}")
 
 
@@ -31,15 +35,15 @@ def json_processor(bucket, file_name, pii_fields):
         raise ValueError(f"JSON file {file_name} must contain a list of JSON objects.")
 
     df = pd.DataFrame(records)
+    pii_fields = resolve_pii_fields(df, pii_fields, detect_pii)
 
-
-    for field in pii_fields:
-        if field in df.columns:
-            df[field] = df[field].apply(lambda x: '*' * len(str(x)) if pd.notna(x) else x)
+    obfuscate_dataframe(df, pii_fields)
 
   
+    # NaN is not valid JSON, so missing and nulled values are written as null.
+    df = df.astype(object).where(df.notna(), None)
     obfuscated_data = df.to_dict(orient='records')
-    obfuscated_json = json.dumps(obfuscated_data, indent=2).encode('utf-8')
+    obfuscated_json = json.dumps(obfuscated_data, indent=2, allow_nan=False).encode('utf-8')
 
     obfuscated_file_name = f"obfuscated_{file_name.split('/')[-1]}"
     obfuscated_bucket = 'obfuscated-files-bucket'
@@ -49,6 +53,7 @@ def json_processor(bucket, file_name, pii_fields):
     return {'statusCode': 200, 'body': 'JSON processed and uploaded to obfuscated-files-bucket'}
 
 
+@profiled
 def lambda_handler(event, context):
     pii_fields = event.get('pii_fields', [])
     print("PII Fields passed:", pii_fields)
@@ -57,6 +62,9 @@ def lambda_handler(event, context):
         s3_uri = event['file_to_obfuscate']
         no_prefix = s3_uri.replace('s3://', '')
         bucket, file_name = no_prefix.split('/', 1)
+    elif 'bucket' in event and 'file_name' in event:
+        bucket = event['bucket']
+        file_name = event['file_name']
     elif 'Records' in event:
         try:
             record = event['Records'][0]
@@ -67,4 +75,12 @@ def lambda_handler(event, context):
     else:
         raise KeyError("Missing required S3 input: 'file_to_obfuscate' or 'Records'")
 
-    return json_processor(bucket=bucket, file_name=file_name, pii_fields=pii_fields)
+    if event.get('dry_run'):
+        return dry_run_response(bucket, file_name, pii_fields, event.get('detect_pii', detect_pii_default()))
+
+    return json_processor(
+        bucket=bucket,
+        file_name=file_name,
+        pii_fields=pii_fields,
+        detect_pii=event.get('detect_pii', detect_pii_default()),
+    )
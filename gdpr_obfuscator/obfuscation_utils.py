@@ -0,0 +1,408 @@
+import inspect
+import re
+from functools import lru_cache
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from gdpr_obfuscator.token_vault import get_token_vault
+
+
+DEFAULT_STRATEGY = 'mask'
+SCRUB_REPLACEMENT = '[REDACTED]'
+FIXED_MASK_WIDTH = 8
+
+# Phone numbers need a '+' or '00' international prefix, or a trunk '0'
+# with separated digit groups, so order numbers, versions and dates don't
+# match. Unseparated national numbers are kept apart in PHONE_DIGITS_PATTERN
+# because they look like zero-padded IDs.
+PHONE_PATTERNS = (
+    r'\+[1-9]\d{0,2}[\s.-]?(?:\(0?\d{1,4}\)[\s.-]?)?\d{2,5}(?:[\s.-]?\d{3,4}){1,2}\b',
+    r'\b00[1-9]\d{0,2}[\s.-](?:\(0?\d{1,4}\)[\s.-]?)?\d{2,5}(?:[\s.-]?\d{3,4}){1,2}\b',
+    r'(?:\(0\d{1,4}\)[\s.-]?|\b0\d{1,4}[\s.-])\d{3,4}[\s.-]?\d{3,4}\b',
+)
+PHONE_DIGITS_PATTERN = r'\b0[1-9]\d{9}\b'
+
+# Substring patterns for PII embedded in free text. They are merged into a
+# single alternation so each column is scanned once by the RE2 kernel.
+SCRUB_PATTERNS = (
+    r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}',
+    r'\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?\b',
+    *PHONE_PATTERNS,
+    PHONE_DIGITS_PATTERN,
+    r'(?i:\b[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}\b)',
+)
+
+
+def to_string_array(values):
+    """
+    Converts a pandas Series or Arrow array into an Arrow string array.
+
+    Nulls are kept as nulls; every other value is stringified.
+
+    Args:
+        values (pd.Series | pa.Array | pa.ChunkedArray): Column values.
+
+    Returns:
+        pa.Array | pa.ChunkedArray: The values as Arrow strings.
+    """
+    if isinstance(values, pd.Series):
+        values = values.astype(str).where(values.notna(), None)
+        return pa.array(values, type=pa.string(), from_pandas=True)
+    if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+        return values
+    return pc.cast(values, pa.string())
+
+
+def to_arrow_array(values):
+    """
+    Converts a pandas Series into an Arrow array, keeping its native type.
+    """
+    if isinstance(values, pd.Series):
+        return pa.array(values, from_pandas=True)
+    return values
+
+
+def mask_kernel(values):
+    """
+    Replaces every character with '*', keeping nulls as nulls.
+    """
+    values = to_string_array(values)
+    return pc.binary_repeat('*', pc.utf8_length(values))
+
+
+def fixed_mask_kernel(values, width=FIXED_MASK_WIDTH):
+    """
+    Replaces every non-null value with the same fixed-width mask, so the
+    original value length is not leaked.
+    """
+    values = to_string_array(values)
+    return pc.if_else(pc.is_valid(values), pa.scalar('*' * width), pa.scalar(None, pa.string()))
+
+
+def keep_last_kernel(values, n=4):
+    """
+    Masks all but the last `n` characters (e.g. the last four card digits).
+    Values no longer than `n` are masked completely.
+    """
+    if n < 1:
+        raise ValueError(f"keep_last needs n of at least 1, got {n}.")
+    values = to_string_array(values)
+    lengths = pc.utf8_length(values)
+    keep = pc.greater(lengths, n)
+    masked = pc.binary_repeat('*', pc.if_else(keep, pc.subtract(lengths, n), lengths))
+    tail = pc.if_else(keep, pc.utf8_slice_codeunits(values, start=-n), pa.scalar(''))
+    return pc.binary_join_element_wise(masked, tail, '')
+
+
+def email_kernel(values, width=FIXED_MASK_WIDTH):
+    """
+    Masks the local part of email addresses with a fixed-width mask while
+    keeping the domain, so values still validate as emails. Values without an
+    '@' are masked completely.
+    """
+    values = to_string_array(values)
+    replaced = pc.replace_substring_regex(values, pattern=r'^[^@]*@', replacement='*' * width + '@')
+    return pc.if_else(pc.match_substring(values, '@'), replaced, mask_kernel(values))
+
+
+def null_kernel(values):
+    """
+    Replaces every value with null, keeping the column type where known.
+    """
+    try:
+        values = to_arrow_array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type columns (e.g. from JSON) have no single Arrow type.
+        return pa.nulls(len(values))
+    return pa.nulls(len(values), type=values.type)
+
+
+def truncate_date_kernel(values, unit='month'):
+    """
+    Truncates dates to the start of the given unit ('year', 'month', 'week' or 'day').
+
+    Temporal columns keep their type. String columns are parsed from their
+    leading ISO date (YYYY-MM-DD) and written back as ISO dates; values that
+    cannot be parsed become null.
+    """
+    values = to_arrow_array(values)
+    if pa.types.is_temporal(values.type):
+        return pc.floor_temporal(values, unit=unit)
+
+    dates = pc.strptime(
+        pc.utf8_slice_codeunits(to_string_array(values), start=0, stop=10),
+        format='%Y-%m-%d',
+        unit='s',
+        error_is_null=True,
+    )
+    return pc.strftime(pc.floor_temporal(dates, unit=unit), format='%Y-%m-%d')
+
+
+@lru_cache(maxsize=32)
+def build_scrub_pattern(terms=()):
+    """
+    Merges the scrub patterns and any dictionary terms into one regex.
+
+    Args:
+        terms (tuple): Literal words (e.g. known names) to scrub as whole words.
+
+    Returns:
+        str: RE2 compatible pattern matching any PII substring.
+    """
+    patterns = list(SCRUB_PATTERNS)
+    if terms:
+        escaped = '|'.join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+        patterns.append(rf'(?i:\b(?:{escaped})\b)')
+    return '|'.join(f'(?:{pattern})' for pattern in patterns)
+
+
+def scrub_kernel(values, terms=()):
+    """
+    Masks PII substrings (emails, phone numbers, IBANs, postcodes and any
+    dictionary terms) inside free text, leaving the surrounding text intact.
+    """
+    values = to_string_array(values)
+    return pc.replace_substring_regex(
+        values,
+        pattern=build_scrub_pattern(tuple(terms)),
+        replacement=SCRUB_REPLACEMENT,
+    )
+
+
+def tokenize_kernel(values, namespace='default'):
+    """
+    Replaces values with consistent pseudonyms from the token vault.
+
+    The column is dictionary encoded so the vault only sees each distinct
+    value once per call, and the tokens are scattered back with a take.
+    """
+    values = to_string_array(values)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    encoded = pc.dictionary_encode(values)
+    tokens = get_token_vault().tokenize(namespace, encoded.dictionary.to_pylist())
+    return pc.take(pa.array(tokens, type=pa.string()), encoded.indices)
+
+
+STRATEGIES = {
+    'mask': mask_kernel,
+    'fixed_mask': fixed_mask_kernel,
+    'keep_last': keep_last_kernel,
+    'email': email_kernel,
+    'null': null_kernel,
+    'truncate_date': truncate_date_kernel,
+    'scrub': scrub_kernel,
+    'tokenize': tokenize_kernel,
+}
+
+
+def strategy_params(strategy):
+    """
+    Returns the keyword parameters a strategy kernel accepts, mapped to
+    their defaults.
+    """
+    parameters = list(inspect.signature(STRATEGIES[strategy]).parameters.values())[1:]
+    return {parameter.name: parameter.default for parameter in parameters}
+
+
+def valid_param(value, default):
+    """
+    Checks a payload value against the type of the kernel default it
+    replaces. Sequence parameters such as scrub terms take lists of strings.
+    """
+    if isinstance(default, tuple):
+        return isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+    if isinstance(default, int):
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, type(default))
+
+
+def normalise_pii_fields(pii_fields):
+    """
+    Normalises the pii_fields payload into a mapping of field to strategy spec.
+
+    Args:
+        pii_fields (list | dict): Either a list of field names, which use the
+            default strategy, or a mapping of field name to a strategy name or
+            a spec such as {"strategy": "keep_last", "n": 4}.
+
+    Returns:
+        dict: Mapping of field name to (strategy name, kernel parameters).
+    """
+    if not isinstance(pii_fields, dict):
+        pii_fields = {field: DEFAULT_STRATEGY for field in pii_fields}
+
+    fields = {}
+    for field, spec in pii_fields.items():
+        if isinstance(spec, dict):
+            params = dict(spec)
+            strategy = params.pop('strategy', DEFAULT_STRATEGY)
+        else:
+            strategy, params = spec, {}
+
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown obfuscation strategy '{strategy}' for field '{field}'.")
+        accepted = strategy_params(strategy)
+        unknown = sorted(set(params) - set(accepted))
+        if unknown:
+            raise ValueError(
+                f"Unknown parameter(s) {', '.join(unknown)} for obfuscation strategy "
+                f"'{strategy}' on field '{field}'."
+            )
+        for name, value in params.items():
+            if not valid_param(value, accepted[name]):
+                raise ValueError(
+                    f"Invalid value {value!r} for parameter {name} of obfuscation strategy "
+                    f"'{strategy}' on field '{field}': expected {type(accepted[name]).__name__}."
+                )
+        fields[field] = (strategy, params)
+    return fields
+
+
+def obfuscate_array(values, strategy=DEFAULT_STRATEGY, **params):
+    """
+    Applies a named strategy kernel to a whole column.
+
+    Args:
+        values (pd.Series | pa.Array | pa.ChunkedArray): Column values.
+        strategy (str): Name of the strategy in STRATEGIES.
+        **params: Extra keyword arguments for the kernel (e.g. n for keep_last).
+
+    Returns:
+        pa.Array | pa.ChunkedArray: The obfuscated column.
+    """
+    return STRATEGIES[strategy](values, **params)
+
+
+def obfuscate_dataframe(df, pii_fields):
+    """
+    Obfuscates the PII columns of a DataFrame in place, one column at a time.
+
+    Args:
+        df (pd.DataFrame): The data to obfuscate.
+        pii_fields (list | dict): Field names, or a mapping of field name to strategy.
+
+    Returns:
+        pd.DataFrame: The same DataFrame with PII columns replaced.
+    """
+    for field, (strategy, params) in normalise_pii_fields(pii_fields).items():
+        if field in df.columns:
+            obfuscated = obfuscate_array(df[field], strategy, **params)
+            df[field] = obfuscated.to_pandas().set_axis(df.index)
+    return df
+
+
+def _list_offsets(values):
+    lengths = pc.fill_null(pc.list_value_length(values), 0)
+    offset_type = pa.int64() if pa.types.is_large_list(values.type) else pa.int32()
+    offsets = pc.cumulative_sum(pc.cast(lengths, offset_type))
+    return pa.concat_arrays([pa.array([0], type=offset_type), offsets])
+
+
+def obfuscate_nested(values, path, strategy=DEFAULT_STRATEGY, **params):
+    """
+    Obfuscates the child of a struct/list column addressed by a field path.
+
+    Struct levels consume one path element; list levels are stepped through
+    transparently, so ['email'] on list<struct<email>> masks every email in
+    every list. Map levels are stepped through into their values, or into
+    their keys with a 'key' path element. Once the path is used up, every leaf below the addressed
+    field is obfuscated. The flattened child arrays are masked with the
+    normal strategy kernels and the parent arrays are rebuilt around them
+    with their original offsets and validity, without converting rows to
+    Python objects.
+
+    Args:
+        values (pa.Array | pa.ChunkedArray): The column to descend into.
+        path (list): Remaining field names below `values`.
+        strategy (str): Name of the strategy in STRATEGIES.
+        **params: Extra keyword arguments for the kernel.
+
+    Returns:
+        pa.Array | pa.ChunkedArray: The column with the addressed child
+            replaced, or unchanged if the path does not exist.
+    """
+    if isinstance(values, pa.ChunkedArray):
+        chunks = values.chunks or [pa.array([], type=values.type)]
+        return pa.chunked_array([obfuscate_nested(chunk, path, strategy, **params) for chunk in chunks])
+
+    if pa.types.is_struct(values.type):
+        if path:
+            indices = [values.type.get_field_index(path[0])]
+            if indices[0] == -1:
+                return values
+        else:
+            indices = range(values.type.num_fields)
+        children = values.flatten()
+        fields = [values.type.field(i) for i in range(values.type.num_fields)]
+        for index in indices:
+            children[index] = obfuscate_nested(children[index], path[1:], strategy, **params)
+            fields[index] = fields[index].with_type(children[index].type)
+        return pa.StructArray.from_arrays(children, fields=fields, mask=values.is_null())
+
+    if pa.types.is_list(values.type) or pa.types.is_large_list(values.type):
+        items = obfuscate_nested(values.flatten(), path, strategy, **params)
+        item_field = values.type.value_field.with_type(items.type)
+        array_class = pa.LargeListArray if pa.types.is_large_list(values.type) else pa.ListArray
+        list_type = pa.large_list(item_field) if pa.types.is_large_list(values.type) else pa.list_(item_field)
+        return array_class.from_arrays(_list_offsets(values), items, type=list_type, mask=values.is_null())
+
+    if pa.types.is_fixed_size_list(values.type):
+        size = values.type.list_size
+        flat = values.values.slice(values.offset * size, len(values) * size)
+        items = obfuscate_nested(flat, path, strategy, **params)
+        list_type = pa.list_(values.type.value_field.with_type(items.type), size)
+        return pa.FixedSizeListArray.from_arrays(items, type=list_type, mask=values.is_null())
+
+    if pa.types.is_map(values.type):
+        # Map keys are only obfuscated when addressed as '<column>.key';
+        # otherwise the path continues into the values.
+        start, end = values.offsets[0].as_py(), values.offsets[-1].as_py()
+        offsets = pc.subtract(values.offsets, start)
+        keys, items = values.keys.slice(start, end - start), values.items.slice(start, end - start)
+        if path and path[0] == 'key':
+            keys = obfuscate_nested(keys, path[1:], strategy, **params)
+        else:
+            items = obfuscate_nested(items, path[1:] if path and path[0] == 'value' else path, strategy, **params)
+        map_type = pa.map_(
+            values.type.key_field.with_type(keys.type),
+            values.type.item_field.with_type(items.type),
+            values.type.keys_sorted,
+        )
+        return pa.MapArray.from_arrays(offsets, keys, items, type=map_type, mask=values.is_null())
+
+    if pa.types.is_nested(values.type):
+        raise ValueError(f"Unsupported nested column type for obfuscation: {values.type}")
+
+    if not path:
+        return obfuscate_array(values, strategy, **params)
+    return values
+
+
+def obfuscate_table(table, pii_fields):
+    """
+    Obfuscates the PII columns of an Arrow table, leaving other columns untouched.
+
+    Field names may be dotted paths into struct and list columns, such as
+    'customer.email' or 'contacts.phone'. A top-level column whose name
+    contains the dots takes precedence.
+
+    Args:
+        table (pa.Table): The data to obfuscate.
+        pii_fields (list | dict): Field names, or a mapping of field name to strategy.
+
+    Returns:
+        pa.Table: A new table with the PII columns replaced.
+    """
+    for field, (strategy, params) in normalise_pii_fields(pii_fields).items():
+        index = table.schema.get_field_index(field)
+        path = []
+        if index == -1 and '.' in field:
+            top_level, *path = field.split('.')
+            index = table.schema.get_field_index(top_level)
+        if index == -1:
+            continue
+
+        obfuscated = obfuscate_nested(table.column(index), path, strategy, **params)
+        table = table.set_column(index, table.schema.field(index).with_type(obfuscated.type), obfuscated)
+    return table
@@ -1,32 +1,79 @@
 import io
 import boto3
-import pandas as pd
-import pyarrow as pa
 import pyarrow.parquet as pq
 from botocore.exceptions import ClientError
+from gdpr_obfuscator.dry_run import dry_run_response
+from gdpr_obfuscator.obfuscation_utils import obfuscate_table
+from gdpr_obfuscator.pii_detector import SAMPLE_SCAN_FACTOR, SAMPLE_SIZE, detect_pii_default, resolve_pii_fields
+from gdpr_obfuscator.profiling import profiled
 
 s3 = boto3.client("s3")
 
 OUTPUT_BUCKET = "obfuscated-files-bucket"
 
+# Codec names reported in Parquet metadata that ParquetWriter spells differently.
+COMPRESSION_CODECS = {"UNCOMPRESSED": "NONE", "LZ4_RAW": "LZ4"}
 
-def parquet_processor(bucket, file_name, pii_fields):
+
+def source_write_options(parquet_file):
+    """
+    Recovers the writer settings used for a Parquet file from its footer.
+
+    Args:
+        parquet_file (pq.ParquetFile): The source file.
+
+    Returns:
+        dict: Keyword arguments for pq.ParquetWriter reproducing the source
+            format version, nested list naming and per-column compression and
+            dictionary encoding.
+    """
+    metadata = parquet_file.metadata
+    options = {"version": metadata.format_version}
+    if metadata.num_row_groups == 0:
+        return options
+
+    compression = {}
+    use_dictionary = []
+    row_group = metadata.row_group(0)
+    for index in range(row_group.num_columns):
+        column = row_group.column(index)
+        compression[column.path_in_schema] = COMPRESSION_CODECS.get(column.compression, column.compression)
+        if any("DICTIONARY" in encoding for encoding in column.encodings):
+            use_dictionary.append(column.path_in_schema)
+
+    options["compression"] = compression
+    options["use_dictionary"] = use_dictionary
+    # Keep the source's list element naming so nested column paths still match.
+    options["use_compliant_nested_type"] = not any(".list.item" in path for path in compression)
+    return options
+
+
+def parquet_processor(bucket, file_name, pii_fields, detect_pii=False):
     print(f"Parquet Processor invoked for file: {file_name} in bucket: {bucket}")
 
     try:
         response = s3.get_object(Bucket=bucket, Key=file_name)
-        file_stream = io.BytesIO(response["Body"].read())
-        df = pd.read_parquet(file_stream)
+        parquet_file = pq.ParquetFile(io.BytesIO(response["Body"].read()))
 
-        for field in pii_fields:
-            if field in df.columns:
-                df[field] = df[field].apply(lambda x: "*" * len(str(x)) if pd.notna(x) else x)
+        if detect_pii and parquet_file.metadata.num_rows:
+            # Decode only the rows the detector samples, not a whole row group.
+            batch = next(parquet_file.iter_batches(batch_size=SAMPLE_SIZE * SAMPLE_SCAN_FACTOR))
+            pii_fields = resolve_pii_fields(batch.to_pandas(), pii_fields, detect_pii)
 
-    
+        # Stream one row group at a time through Arrow so the source row-group
+        # layout is kept and non-PII columns are never converted to pandas.
         output_stream = io.BytesIO()
-        table = pa.Table.from_pandas(df)
-        pq.write_table(table, output_stream)
-        output_stream.seek(0)
+        writer = None
+        for index in range(parquet_file.metadata.num_row_groups):
+            table = obfuscate_table(parquet_file.read_row_group(index), pii_fields)
+            if writer is None:
+                writer = pq.ParquetWriter(output_stream, table.schema, **source_write_options(parquet_file))
+            writer.write_table(table, row_group_size=max(table.num_rows, 1))
+
+        if writer is None:
+            empty = obfuscate_table(parquet_file.schema_arrow.empty_table(), pii_fields)
+            writer = pq.ParquetWriter(output_stream, empty.schema, **source_write_options(parquet_file))
+        writer.close()
 
         output_key = f"obfuscated/{file_name.split('/')[-1]}"
         s3.put_object(Bucket=OUTPUT_BUCKET, Key=output_key, Body=output_stream.getvalue())
@@ -43,17 +90,30 @@ def parquet_processor(bucket, file_name, pii_fields):
         raise RuntimeError(f"Error processing Parquet file: {str(e)}")
 
 
+@profiled
 def lambda_handler(event, context):
     try:
-        records = event.get("Records", [])
-        if not records:
-            raise KeyError("Invalid event structure: 'Records' key is missing.")
-        
-        bucket = records[0]["s3"]["bucket"]["name"]
-        file_name = records[0]["s3"]["object"]["key"]
+        if "bucket" in event and "file_name" in event:
+            bucket = event["bucket"]
+            file_name = event["file_name"]
+        else:
+            records = event.get("Records", [])
+            if not records:
+                raise KeyError("Invalid event structure: 'Records' key is missing.")
+
+            bucket = records[0]["s3"]["bucket"]["name"]
+            file_name = records[0]["s3"]["object"]["key"]
         pii_fields = event.get("pii_fields", [])
-        
-        return parquet_processor(bucket=bucket, file_name=file_name, pii_fields=pii_fields)
+
+        if event.get("dry_run"):
+            return dry_run_response(bucket, file_name, pii_fields, event.get("detect_pii", detect_pii_default()))
+
+        return parquet_processor(
+            bucket=bucket,
+            file_name=file_name,
+            pii_fields=pii_fields,
+            detect_pii=event.get("detect_pii", detect_pii_default()),
+        )
     
     except KeyError as e:
         raise e
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import re
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from gdpr_obfuscator.obfuscation_utils import DEFAULT_STRATEGY, PHONE_DIGITS_PATTERN, PHONE_PATTERNS
+
+
+SAMPLE_SIZE = 200
+# At most SAMPLE_SIZE * SAMPLE_SCAN_FACTOR rows are scanned for non-null values.
+SAMPLE_SCAN_FACTOR = 10
+MATCH_THRESHOLD = 0.6
+
+# Patterns are anchored and compiled once into match options so each column
+# sample is checked with a single vectorized Arrow kernel call.
+PII_PATTERNS = {
+    'email': pc.MatchSubstringOptions(r'^[^@\s]+@[^@\s]+\.[A-Za-z]{2,}$'),
+    'phone': pc.MatchSubstringOptions('^(?:' + '|'.join(PHONE_PATTERNS) + ')$'),
+    'iban': pc.MatchSubstringOptions(r'^[A-Z]{2}\d{2}(?: ?[A-Z0-9]){11,30}$'),
+    'postcode': pc.MatchSubstringOptions(
+        r'(?i)^[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}$'
+    ),
+}
+
+# Unseparated digit strings look the same as zero-padded IDs, so they only
+# count as phones in a column whose name says so.
+PHONE_DIGITS = pc.MatchSubstringOptions(f'^{PHONE_DIGITS_PATTERN}$')
+PHONE_COLUMN_HINT = re.compile(r'phone|mobile|msisdn|fax|(?:^|[^a-z])tel(?:$|[^a-z])', re.IGNORECASE)
+
+NAME_DICTIONARY = pa.array(sorted({
+    'adam', 'alex', 'alice', 'amelia', 'amy', 'andrew', 'anna', 'ben',
+    'charlie', 'charlotte', 'chloe', 'chris', 'daniel', 'david', 'emily',
+    'emma', 'ella', 'ethan', 'freya', 'george', 'grace', 'hannah', 'harry',
+    'isabella', 'isla', 'jack', 'jacob', 'james', 'jane', 'jessica', 'john',
+    'joseph', 'joshua', 'katie', 'laura', 'leo', 'liam', 'lily', 'lucy',
+    'mark', 'mary', 'matthew', 'mia', 'michael', 'mohammed', 'noah', 'oliver',
+    'olivia', 'oscar', 'paul', 'peter', 'rachel', 'robert', 'ruby', 'samuel',
+    'sarah', 'sophie', 'thomas', 'william', 'zoe',
+    'brown', 'davies', 'evans', 'green', 'hall', 'hughes', 'jackson',
+    'johnson', 'jones', 'lewis', 'roberts', 'smith', 'taylor',
+    'walker', 'white', 'williams', 'wilson', 'wood', 'wright',
+}))
+
+# Verdicts keyed by schema fingerprint; module level so warm Lambda
+# containers reuse them across invocations.
+_detection_cache = {}
+
+
+def schema_fingerprint(df):
+    """
+    Builds a stable fingerprint from a DataFrame's column names and dtypes.
+
+    Args:
+        df (pd.DataFrame): The data whose schema is fingerprinted.
+
+    Returns:
+        str: Hex digest identifying the schema.
+    """
+    schema = '|'.join(f"{column}:{dtype}" for column, dtype in df.dtypes.items())
+    return hashlib.sha256(schema.encode('utf-8')).hexdigest()
+
+
+def _sample_column(series, sample_size):
+    # Bound the rows looked at before dropping nulls, so sparse columns
+    # don't make sampling scan and copy the whole column.
+    sample = series.iloc[:sample_size * SAMPLE_SCAN_FACTOR].dropna().head(sample_size)
+    if sample.empty:
+        return None
+    return pc.utf8_trim_whitespace(pa.array(sample.astype(str), type=pa.string()))
+
+
+def _match_ratio(values, options):
+    return pc.mean(pc.match_substring_regex(values, options=options)).as_py()
+
+
+def _name_ratio(values):
+    tokens = pc.list_flatten(pc.utf8_split_whitespace(pc.utf8_lower(values)))
+    if len(tokens) == 0:
+        return 0.0
+    return pc.mean(pc.is_in(tokens, value_set=NAME_DICTIONARY)).as_py()
+
+
+def detect_column(series, sample_size=SAMPLE_SIZE, threshold=MATCH_THRESHOLD):
+    """
+    Classifies a single column by matching a bounded sample of its values.
+
+    Args:
+        series (pd.Series): Column to inspect. Only string-like columns are checked.
+        sample_size (int): Maximum number of non-null values inspected.
+        threshold (float): Fraction of sampled values that must match.
+
+    Returns:
+        str | None: The detected PII kind, or None if nothing matched.
+    """
+    if not pd.api.types.is_string_dtype(series):
+        return None
+
+    values = _sample_column(series, sample_size)
+    if values is None:
+        return None
+
+    for kind, options in PII_PATTERNS.items():
+        if _match_ratio(values, options) >= threshold:
+            return kind
+
+    if PHONE_COLUMN_HINT.search(str(series.name)) and _match_ratio(values, PHONE_DIGITS) >= threshold:
+        return 'phone'
+
+    if _name_ratio(values) >= threshold:
+        return 'name'
+
+    return None
+
+
+def detect_pii_columns(df, sample_size=SAMPLE_SIZE, threshold=MATCH_THRESHOLD):
+    """
+    Detects columns that look like PII, caching the verdict per schema.
+
+    Only the first `sample_size` non-null values among the first
+    `sample_size * SAMPLE_SCAN_FACTOR` rows of each column are inspected, so
+    the cost is independent of file size. Files sharing a schema fingerprint
+    reuse the cached verdict without sampling again.
+
+    Args:
+        df (pd.DataFrame): The data to inspect.
+        sample_size (int): Maximum number of values sampled per column.
+        threshold (float): Fraction of sampled values that must match.
+
+    Returns:
+        dict: Mapping of detected column name to PII kind.
+    """
+    fingerprint = schema_fingerprint(df)
+    if fingerprint in _detection_cache:
+        return _detection_cache[fingerprint]
+
+    detected = {}
+    conclusive = True
+    for column in df.columns:
+        series = df[column]
+        kind = detect_column(series, sample_size=sample_size, threshold=threshold)
+        if kind:
+            detected[column] = kind
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            conclusive = conclusive and series.iloc[:sample_size * SAMPLE_SCAN_FACTOR].notna().any()
+
+    # A text column with no sampled values (an empty file, or nulls so far)
+    # says nothing about later files with this schema, so don't let it stick.
+    if conclusive:
+        _detection_cache[fingerprint] = detected
+    return detected
+
+
+def detect_pii_default():
+    """
+    Whether detection runs for events that don't set 'detect_pii', such as
+    S3 notifications, read from the DETECT_PII environment variable.
+    """
+    return os.environ.get('DETECT_PII', '').lower() in ('1', 'true', 'yes')
+
+
+def resolve_pii_fields(df, pii_fields, detect_pii=False):
+    """
+    Combines caller supplied PII fields with automatically detected ones.
+
+    Args:
+        df (pd.DataFrame): The data being obfuscated.
+        pii_fields (list | dict): Field names, or a mapping of field name to
+            strategy, supplied by the caller.
+        detect_pii (bool): Whether to run automatic detection.
+
+    Returns:
+        list | dict: Caller fields followed by any additional detected fields,
+            in the same shape as `pii_fields`. Detected fields use the default strategy.
+    """
+    if not detect_pii:
+        return pii_fields
+
+    detected = detect_pii_columns(df)
+    if detected:
+        print("Detected PII fields:", detected)
+    new_fields = [field for field in detected if field not in pii_fields]
+    if isinstance(pii_fields, dict):
+        return {**pii_fields, **{field: DEFAULT_STRATEGY for field in new_fields}}
+    return list(pii_fields) + new_fields
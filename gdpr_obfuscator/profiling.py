@@ -0,0 +1,124 @@
+import cProfile
+import functools
+import os
+import tempfile
+import time
+import tracemalloc
+import boto3
+
+s3 = boto3.client('s3')
+
+PROFILE_ENV_VAR = 'GDPR_PROFILE'
+PROFILE_OUTPUT_ENV_VAR = 'GDPR_PROFILE_OUTPUT'
+DEFAULT_PROFILE_OUTPUT = os.path.join(tempfile.gettempdir(), 'gdpr_profiles')
+TOP_ALLOCATIONS = 25
+
+
+def profiling_enabled(event):
+    """
+    Checks whether profiling was requested by environment variable or event flag.
+
+    Args:
+        event (dict): The Lambda event.
+
+    Returns:
+        bool: True if this invocation should be profiled.
+    """
+    if os.environ.get(PROFILE_ENV_VAR, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return isinstance(event, dict) and event.get('profile') is True
+
+
+def format_allocations(snapshot, peak, limit=TOP_ALLOCATIONS):
+    """
+    Renders the top allocation sites of a tracemalloc snapshot as text.
+    """
+    lines = [f"Peak traced memory: {peak / 1024:.1f} KiB", f"Top {limit} allocation sites:"]
+    for stat in snapshot.statistics('lineno')[:limit]:
+        lines.append(str(stat))
+    return '\n'.join(lines) + '\n'
+
+
+def write_local_reports(profiler, allocations, name, local_dir):
+    """
+    Writes both reports into a local directory and returns their paths.
+    """
+    os.makedirs(local_dir, exist_ok=True)
+    stats_path = os.path.join(local_dir, f"{name}.prof")
+    allocations_path = os.path.join(local_dir, f"{name}.allocations.txt")
+    profiler.dump_stats(stats_path)
+    with open(allocations_path, 'w') as allocations_file:
+        allocations_file.write(allocations)
+    return [stats_path, allocations_path]
+
+
+def write_profile(profiler, allocations, name):
+    """
+    Writes the cProfile stats (pstats format, loadable by snakeviz or
+    pstats.Stats) and the allocation report to the configured location.
+
+    The location comes from GDPR_PROFILE_OUTPUT and is either a local
+    directory or an s3://bucket/prefix URI.
+
+    Args:
+        profiler (cProfile.Profile): The finished profiler.
+        allocations (str): Text report of the top allocation sites.
+        name (str): Base file name shared by both outputs.
+
+    Returns:
+        list: Locations the two files were written to.
+    """
+    output = os.environ.get(PROFILE_OUTPUT_ENV_VAR, DEFAULT_PROFILE_OUTPUT)
+    if not output.startswith('s3://'):
+        return write_local_reports(profiler, allocations, name, output)
+
+    # Stage S3 uploads in a temporary directory so warm containers don't
+    # fill their ephemeral storage with one pair of reports per invocation.
+    bucket, _, prefix = output.replace('s3://', '').partition('/')
+    locations = []
+    with tempfile.TemporaryDirectory() as local_dir:
+        for path in write_local_reports(profiler, allocations, name, local_dir):
+            key = '/'.join(part for part in (prefix.rstrip('/'), os.path.basename(path)) if part)
+            with open(path, 'rb') as profile_file:
+                s3.put_object(Bucket=bucket, Key=key, Body=profile_file.read())
+            locations.append(f"s3://{bucket}/{key}")
+    return locations
+
+
+def profiled(handler):
+    """
+    Decorates a Lambda handler so an invocation can be profiled on demand.
+
+    When profiling is disabled the handler is called directly, with nothing
+    but the flag check added. When enabled, the invocation runs under
+    cProfile and tracemalloc and both reports are written out afterwards.
+    Failing to write a report never fails the invocation.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if not profiling_enabled(event):
+            return handler(event, context)
+
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return handler(event, context)
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+
+            request_id = getattr(context, 'aws_request_id', None) or str(os.getpid())
+            name = f"{handler.__module__.split('.')[-1]}_{int(time.time())}_{request_id}"
+            try:
+                locations = write_profile(profiler, format_allocations(snapshot, peak), name)
+                print("Profile written to:", locations)
+            except Exception as e:
+                print(f"Failed to write profile {name}: {e}")
+
+    return wrapper
@@ -0,0 +1,168 @@
+import json
+import os
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
+from gdpr_obfuscator.pii_detector import detect_pii_default
+from gdpr_obfuscator.profiling import profiled
+from gdpr_obfuscator.routing import process_object
+
+DEFAULT_MAX_WORKERS = 4
+MAX_RECEIVE_COUNT = 3
+
+
+def default_pii_fields():
+    """
+    PII fields used for messages that don't carry their own, read from the
+    comma separated PII_FIELDS environment variable.
+    """
+    return [field.strip() for field in os.environ.get('PII_FIELDS', '').split(',') if field.strip()]
+
+
+def parse_message(body):
+    """
+    Extracts the files to obfuscate from one queue message body.
+
+    The body is either an S3 event notification, possibly covering several
+    objects, or a payload in the handlers' own format ('file_to_obfuscate'
+    or 'bucket'/'file_name', with optional 'pii_fields' and 'detect_pii').
+    Messages without them fall back to the PII_FIELDS and DETECT_PII
+    environment variables.
+
+    Args:
+        body (str): The JSON message body.
+
+    Returns:
+        list: (bucket, file_name, pii_fields, detect_pii) tuples. S3 test
+            events yield no work.
+    """
+    message = json.loads(body)
+    pii_fields = message.get('pii_fields', default_pii_fields())
+    detect_pii = message.get('detect_pii', detect_pii_default())
+
+    if message.get('Event') == 's3:TestEvent':
+        return []
+    if 'file_to_obfuscate' in message:
+        bucket, file_name = message['file_to_obfuscate'].replace('s3://', '').split('/', 1)
+        return [(bucket, file_name, pii_fields, detect_pii)]
+    if 'bucket' in message and 'file_name' in message:
+        return [(message['bucket'], message['file_name'], pii_fields, detect_pii)]
+    if 'Records' in message:
+        try:
+            return [
+                (
+                    record['s3']['bucket']['name'],
+                    unquote_plus(record['s3']['object']['key']),
+                    pii_fields,
+                    detect_pii,
+                )
+                for record in message['Records']
+            ]
+        except (KeyError, TypeError):
+            raise KeyError("Malformed S3 event structure: missing bucket or key info")
+    raise KeyError("Missing required S3 input: 'file_to_obfuscate' or 'Records'")
+
+
+def process_message(record):
+    """
+    Processes every file referenced by one SQS record.
+
+    Returns:
+        str | None: The message id if any file failed, otherwise None.
+    """
+    try:
+        for bucket, file_name, pii_fields, detect_pii in parse_message(record['body']):
+            process_object(bucket, file_name, pii_fields, detect_pii)
+    except Exception as e:
+        print(f"Failed to process message {record.get('messageId')}: {e}")
+        return record.get('messageId')
+    return None
+
+
+@profiled
+def lambda_handler(event, context):
+    """
+    SQS batch consumer that obfuscates many small files in one invocation.
+
+    Files are processed in this process with the handlers' warm S3 clients,
+    instead of one dispatcher and one handler invocation per file. Failed
+    messages are reported as partial batch failures (the event source
+    mapping needs ReportBatchItemFailures enabled), so only they are retried.
+
+    Args:
+        event (dict): SQS event with a batch of messages in 'Records'.
+        context (LambdaContext): Runtime information provided by AWS Lambda.
+    Returns:
+        dict: The batchItemFailures response expected by SQS.
+    """
+    records = event.get('Records', [])
+    print(f"Queue consumer received {len(records)} messages")
+
+    max_workers = int(os.environ.get('QUEUE_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        failed_ids = [message_id for message_id in pool.map(process_message, records) if message_id]
+
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_ids]}
+
+
+class LocalQueue:
+    """
+    In-memory stand-in for an SQS queue feeding the consumer, for local runs
+    and tests. Messages reported as failed are made visible again until they
+    reach max_receive_count, after which they move to dead_letters.
+    """
+
+    def __init__(self, max_receive_count=MAX_RECEIVE_COUNT):
+        self.max_receive_count = max_receive_count
+        self.messages = deque()
+        self.dead_letters = []
+
+    def send_message(self, body):
+        message_id = str(uuid.uuid4())
+        self.messages.append({'messageId': message_id, 'body': body, 'receive_count': 0})
+        return message_id
+
+    def receive_messages(self, max_messages=10):
+        batch = []
+        while self.messages and len(batch) < max_messages:
+            message = self.messages.popleft()
+            message['receive_count'] += 1
+            batch.append(message)
+        return batch
+
+    def return_failed(self, batch, failed_ids):
+        for message in batch:
+            if message['messageId'] not in failed_ids:
+                continue
+            if message['receive_count'] >= self.max_receive_count:
+                self.dead_letters.append(message)
+            else:
+                self.messages.append(message)
+
+
+def drain_queue(queue, handler=lambda_handler, batch_size=10):
+    """
+    Feeds a LocalQueue to the consumer in batches until it is empty.
+
+    Returns:
+        dict: Number of invocations, messages delivered and dead letters.
+    """
+    invocations = 0
+    delivered = 0
+    while queue.messages:
+        batch = queue.receive_messages(batch_size)
+        records = [
+            {
+                'messageId': message['messageId'],
+                'body': message['body'],
+                'attributes': {'ApproximateReceiveCount': str(message['receive_count'])},
+            }
+            for message in batch
+        ]
+        response = handler({'Records': records}, None)
+        failed_ids = {failure['itemIdentifier'] for failure in response['batchItemFailures']}
+        queue.return_failed(batch, failed_ids)
+        invocations += 1
+        delivered += len(batch)
+    return {'invocations': invocations, 'delivered': delivered, 'dead_letters': len(queue.dead_letters)}
@@ -0,0 +1,40 @@
+from gdpr_obfuscator.csv_handler import csv_processor
+from gdpr_obfuscator.json_handler import json_processor
+from gdpr_obfuscator.parquet_handler import parquet_processor
+
+
+PROCESSORS = {
+    'csv': csv_processor,
+    'json': json_processor,
+    'parquet': parquet_processor,
+}
+
+
+def get_file_extension(file_name):
+    return file_name.split('.')[-1].lower()
+
+
+def process_object(bucket, file_name, pii_fields, detect_pii=False):
+    """
+    Runs the processor for an object's file type in the current process,
+    without invoking a separate Lambda function.
+
+    Args:
+        bucket (str): The bucket containing the object.
+        file_name (str): The object key.
+        pii_fields (list | dict): Fields to obfuscate.
+        detect_pii (bool): Whether to also detect PII columns automatically.
+
+    Returns:
+        dict: The processor's response.
+    """
+    file_extension = get_file_extension(file_name)
+    if file_extension not in PROCESSORS:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+    return PROCESSORS[file_extension](
+        bucket=bucket,
+        file_name=file_name,
+        pii_fields=pii_fields,
+        detect_pii=detect_pii,
+    )
@@ -0,0 +1,191 @@
+import os
+import secrets
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 100_000
+# Keeps IN (...) lists under SQLite's bound parameter limit.
+SQLITE_BATCH_SIZE = 500
+TOKEN_PREFIX = 'tok_'
+
+_token_vault = None
+
+
+def new_token():
+    return TOKEN_PREFIX + secrets.token_hex(8)
+
+
+class TokenVault(ABC):
+    """
+    Base class for persistent value to token mappings.
+
+    Backends implement the three bulk operations below. They are always
+    called with a whole batch of distinct values, never once per row, so a
+    key-value store backend can map them onto its batch get/put APIs.
+    """
+
+    @abstractmethod
+    def lookup(self, namespace, values):
+        """Returns a dict of value to token for the values already stored."""
+
+    @abstractmethod
+    def insert(self, namespace, mapping):
+        """
+        Stores new value to token pairs without overwriting existing ones.
+        Returns the stored mapping for those values, so a token written first
+        by a concurrent writer wins.
+        """
+
+    @abstractmethod
+    def reverse_lookup(self, namespace, tokens):
+        """Returns a dict of token to original value, for authorised re-identification."""
+
+    def tokenize(self, namespace, values):
+        """
+        Returns the token for every value, creating tokens for unseen values.
+
+        Args:
+            namespace (str): Keeps unrelated token spaces apart.
+            values (list): Distinct, non-null string values.
+
+        Returns:
+            list: Tokens in the same order as values.
+        """
+        tokens = self.lookup(namespace, values)
+        missing = [value for value in values if value not in tokens]
+        if missing:
+            tokens.update(self.insert(namespace, {value: new_token() for value in missing}))
+        return [tokens[value] for value in values]
+
+
+class SQLiteTokenVault(TokenVault):
+    """
+    Token vault stored in a local SQLite database. Intended for local runs:
+    on Lambda the filesystem is per container, so tokens would not stay
+    consistent across invocations.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS tokens ('
+                'namespace TEXT NOT NULL, value TEXT NOT NULL, token TEXT NOT NULL, '
+                'PRIMARY KEY (namespace, value))'
+            )
+            self._connection.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS tokens_by_token ON tokens (namespace, token)'
+            )
+
+    def _select(self, column, key_column, namespace, keys):
+        found = {}
+        for start in range(0, len(keys), SQLITE_BATCH_SIZE):
+            batch = keys[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._connection.execute(
+                f'SELECT {key_column}, {column} FROM tokens '
+                f'WHERE namespace = ? AND {key_column} IN ({placeholders})',
+                [namespace, *batch],
+            )
+            found.update(rows)
+        return found
+
+    def lookup(self, namespace, values):
+        with self._lock:
+            return self._select('token', 'value', namespace, list(values))
+
+    def insert(self, namespace, mapping):
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR IGNORE INTO tokens (namespace, value, token) VALUES (?, ?, ?)',
+                    [(namespace, value, token) for value, token in mapping.items()],
+                )
+            return self._select('token', 'value', namespace, list(mapping))
+
+    def reverse_lookup(self, namespace, tokens):
+        with self._lock:
+            return self._select('value', 'token', namespace, list(tokens))
+
+    def close(self):
+        self._connection.close()
+
+
+class CachedTokenVault(TokenVault):
+    """
+    In-memory LRU cache in front of another vault. Only values missing from
+    the cache reach the backend, in a single bulk call per batch.
+    """
+
+    def __init__(self, backend, max_size=DEFAULT_CACHE_SIZE):
+        self.backend = backend
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, namespace, values, tokens):
+        for value, token in zip(values, tokens):
+            self._cache[(namespace, value)] = token
+            self._cache.move_to_end((namespace, value))
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def tokenize(self, namespace, values):
+        with self._lock:
+            cached = {}
+            for value in values:
+                token = self._cache.get((namespace, value))
+                if token is not None:
+                    self._cache.move_to_end((namespace, value))
+                    cached[value] = token
+        missing = [value for value in values if value not in cached]
+        if missing:
+            tokens = self.backend.tokenize(namespace, missing)
+            cached.update(zip(missing, tokens))
+            with self._lock:
+                self._remember(namespace, missing, tokens)
+        return [cached[value] for value in values]
+
+    def lookup(self, namespace, values):
+        return self.backend.lookup(namespace, values)
+
+    def insert(self, namespace, mapping):
+        return self.backend.insert(namespace, mapping)
+
+    def reverse_lookup(self, namespace, tokens):
+        return self.backend.reverse_lookup(namespace, tokens)
+
+
+def get_token_vault():
+    """
+    Returns the vault used by the tokenize strategy. Unless one was set with
+    set_token_vault, this is a cached SQLite vault at TOKEN_VAULT_PATH,
+    created once per container and reused by warm invocations.
+
+    Raises:
+        RuntimeError: If no vault was set and TOKEN_VAULT_PATH is not configured.
+    """
+    global _token_vault
+    if _token_vault is None:
+        path = os.environ.get('TOKEN_VAULT_PATH')
+        if not path:
+            raise RuntimeError(
+                "No token vault configured: set TOKEN_VAULT_PATH or call set_token_vault "
+                "before using the tokenize strategy."
+            )
+        _token_vault = CachedTokenVault(SQLiteTokenVault(path))
+    return _token_vault
+
+
+def set_token_vault(vault):
+    """
+    Replaces the vault used by the tokenize strategy, e.g. with a key-value
+    store backend implementing TokenVault.
+    """
+    global _token_vault
+    _token_vault = vault
@@ -67,6 +67,7 @@ resource "aws_lambda_function" "csv_processor_function" {
   environment {
     variables = {
       OUTPUT_BUCKET = "obfuscated-files-bucket"
+      DETECT_PII    = var.detect_pii
     }
   }
 }
@@ -82,6 +83,7 @@ resource "aws_lambda_function" "json_processor_function" {
   environment {
     variables = {
       OUTPUT_BUCKET = "obfuscated-files-bucket"
+      DETECT_PII    = var.detect_pii
     }
   }
 }
@@ -97,6 +99,7 @@ resource "aws_lambda_function" "parquet_processor_function" {
   environment {
     variables = {
       OUTPUT_BUCKET = "obfuscated-files-bucket"
+      DETECT_PII    = var.detect_pii
     }
   }
 }
@@ -12,3 +12,8 @@ variable "output_bucket_name" {
   description = "S3 bucket for obfuscated files"
   default     = "obfuscated-files-bucket"
 }
+
+variable "detect_pii" {
+  description = "Default for automatic PII column detection when an event does not set detect_pii"
+  default     = "false"
+}
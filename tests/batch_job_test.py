@@ -0,0 +1,159 @@
+import io
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from gdpr_obfuscator import batch_job
+from botocore.exceptions import ClientError
+
+
+class FakeS3:
+    """Minimal in-memory stand-in for the get_object/put_object calls used by batch jobs."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not found"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+
+ENTRIES = [("source-bucket", f"data/file{i}.csv") for i in range(10)]
+
+
+# ==========================
+# Tests for parse_manifest
+# ==========================
+
+def test_parse_manifest_inventory_csv():
+    content = '"source-bucket","data/my+file%281%29.csv","1024"\n"source-bucket","data/b.json","10"\n'
+
+    entries = batch_job.parse_manifest(content, "inventory/report.csv")
+
+    assert entries == [("source-bucket", "data/my file(1).csv"), ("source-bucket", "data/b.json")]
+
+
+def test_parse_manifest_key_list():
+    content = "s3://other-bucket/a.csv\n\ndata/b.parquet\n"
+
+    entries = batch_job.parse_manifest(content, "keys.txt", source_bucket="source-bucket")
+
+    assert entries == [("other-bucket", "a.csv"), ("source-bucket", "data/b.parquet")]
+
+
+def test_parse_manifest_key_list_requires_bucket():
+    with pytest.raises(ValueError, match="no source_bucket"):
+        batch_job.parse_manifest("data/b.parquet\n", "keys.txt")
+
+
+# ==========================
+# Tests for run_manifest_job
+# ==========================
+
+@patch("gdpr_obfuscator.batch_job.process_object")
+def test_run_manifest_job_processes_all_entries(mock_process):
+    fake_s3 = FakeS3()
+
+    def process(bucket, key, pii_fields, detect_pii):
+        if key.endswith("file3.csv"):
+            raise ValueError("bad file")
+        return {"statusCode": 200}
+
+    mock_process.side_effect = process
+
+    with patch("gdpr_obfuscator.batch_job.s3", fake_s3):
+        summary = batch_job.run_manifest_job(
+            ENTRIES, ["name"], "jobs-bucket", "job.checkpoint.json", max_workers=3, checkpoint_every=4
+        )
+
+    assert mock_process.call_count == 10
+    assert summary["complete"] is True
+    assert summary["processed"] == 9
+    assert summary["failed"] == 1
+    assert summary["failures"][0]["file"] == "s3://source-bucket/data/file3.csv"
+    checkpoint = json.loads(fake_s3.objects[("jobs-bucket", "job.checkpoint.json")])
+    assert checkpoint["next_index"] == 10
+
+
+@patch("gdpr_obfuscator.batch_job.process_object")
+def test_run_manifest_job_logs_failures_outside_checkpoint(mock_process):
+    fake_s3 = FakeS3()
+    mock_process.side_effect = ValueError("bad file")
+
+    with patch("gdpr_obfuscator.batch_job.s3", fake_s3), patch("gdpr_obfuscator.batch_job.MAX_INLINE_FAILURES", 3):
+        summary = batch_job.run_manifest_job(
+            ENTRIES, ["name"], "jobs-bucket", "job.checkpoint.json", max_workers=1, checkpoint_every=4
+        )
+
+    checkpoint = json.loads(fake_s3.objects[("jobs-bucket", "job.checkpoint.json")])
+    assert checkpoint["failed"] == summary["failed"] == 10
+    assert [failure["index"] for failure in checkpoint["failures"]] == [0, 1, 2]
+    log_keys = sorted(key for bucket, key in fake_s3.objects if key.startswith("job.checkpoint.json.failures/"))
+    assert log_keys == [f"job.checkpoint.json.failures/{index:012d}.jsonl" for index in (0, 4, 8)]
+    logged = [
+        json.loads(line)["index"]
+        for key in log_keys
+        for line in fake_s3.objects[("jobs-bucket", key)].decode().splitlines()
+    ]
+    assert logged == list(range(10))
+    assert summary["failure_log"] == "s3://jobs-bucket/job.checkpoint.json.failures/"
+
+
+@patch("gdpr_obfuscator.batch_job.process_object")
+def test_run_manifest_job_resumes_from_checkpoint(mock_process):
+    checkpoint = {"next_index": 6, "processed": 6, "failures": [], "elapsed_seconds": 1.5}
+    fake_s3 = FakeS3({("jobs-bucket", "job.checkpoint.json"): json.dumps(checkpoint).encode()})
+
+    with patch("gdpr_obfuscator.batch_job.s3", fake_s3):
+        summary = batch_job.run_manifest_job(ENTRIES, ["name"], "jobs-bucket", "job.checkpoint.json")
+
+    processed_keys = sorted(call.args[1] for call in mock_process.call_args_list)
+    assert processed_keys == [f"data/file{i}.csv" for i in range(6, 10)]
+    assert summary["processed"] == 10
+    assert summary["total_seconds"] >= 1.5
+
+
+@patch("gdpr_obfuscator.batch_job.process_object")
+def test_run_manifest_job_stops_before_timeout(mock_process):
+    fake_s3 = FakeS3()
+    remaining = iter([60_000, 60_000, 1_000])
+
+    with patch("gdpr_obfuscator.batch_job.s3", fake_s3):
+        summary = batch_job.run_manifest_job(
+            ENTRIES, ["name"], "jobs-bucket", "job.checkpoint.json",
+            max_workers=1, time_remaining_ms=lambda: next(remaining, 0)
+        )
+
+    assert summary["complete"] is False
+    assert summary["next_index"] == mock_process.call_count == 2
+    checkpoint = json.loads(fake_s3.objects[("jobs-bucket", "job.checkpoint.json")])
+    assert checkpoint["next_index"] == 2
+
+
+# ==========================
+# Tests for lambda_handler
+# ==========================
+
+@patch("gdpr_obfuscator.batch_job.process_object")
+def test_lambda_handler_reads_manifest(mock_process):
+    fake_s3 = FakeS3({("jobs-bucket", "manifests/keys.txt"): b"data/a.csv\ndata/b.json\n"})
+    event = {
+        "manifest": "s3://jobs-bucket/manifests/keys.txt",
+        "source_bucket": "source-bucket",
+        "pii_fields": ["name"]
+    }
+
+    with patch("gdpr_obfuscator.batch_job.s3", fake_s3):
+        response = batch_job.lambda_handler(event, MagicMock(get_remaining_time_in_millis=lambda: 900_000))
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["processed"] == 2
+    assert ("jobs-bucket", "manifests/keys.txt.checkpoint.json") in fake_s3.objects
+
+
+def test_lambda_handler_missing_manifest():
+    with pytest.raises(KeyError, match="manifest"):
+        batch_job.lambda_handler({}, None)
@@ -43,6 +43,24 @@ def test_csv_processor_missing_pii_fields(mock_s3):
     assert "obfuscated" in response["body"]
 
 
+@patch("gdpr_obfuscator.csv_handler.s3")
+def test_csv_processor_detects_unlisted_pii(mock_s3):
+    mock_body = io.BytesIO(b"name,contact,age\nJohn,john@example.com,30\nJane,jane@example.com,31\n")
+    mock_s3.get_object.return_value = {"Body": mock_body}
+
+    csv_handler.csv_processor(
+        bucket="obfuscator-tool-bucket",
+        file_name="sample.csv",
+        pii_fields=["name"],
+        detect_pii=True
+    )
+
+    body = mock_s3.put_object.call_args.kwargs["Body"]
+    assert "john@example.com" not in body
+    assert "****************" in body
+    assert "30" in body
+
+
 @patch("gdpr_obfuscator.csv_handler.s3")
 def test_csv_processor_missing_header(mock_s3):
     mock_body = io.BytesIO(b"")
@@ -96,7 +114,8 @@ def test_lambda_handler_success(mock_processor):
     mock_processor.assert_called_once_with(
         bucket="obfuscator-tool-bucket",
         file_name="test_file.csv",
-        pii_fields=["name", "email"]
+        pii_fields=["name", "email"],
+        detect_pii=False
     )
     assert result["statusCode"] == 200
     assert result["body"] == "CSV processed and uploaded to obfuscated-files-bucket"
@@ -120,11 +139,36 @@ def test_lambda_handler_defaults_pii_fields(mock_processor):
     mock_processor.assert_called_once_with(
         bucket="obfuscator-tool-bucket",
         file_name="test_file.csv",
-        pii_fields=[]
+        pii_fields=[],
+        detect_pii=False
     )
     assert result["statusCode"] == 200
 
 
+@patch("gdpr_obfuscator.csv_handler.csv_processor")
+def test_lambda_handler_detect_pii_from_env(mock_processor, monkeypatch):
+    monkeypatch.setenv("DETECT_PII", "true")
+    mock_processor.return_value = {"statusCode": 200, "body": "OK"}
+
+    event = {
+        "Records": [{
+            "s3": {
+                "bucket": {"name": "obfuscator-tool-bucket"},
+                "object": {"key": "test_file.csv"}
+            }
+        }]
+    }
+
+    csv_handler.lambda_handler(event, None)
+
+    mock_processor.assert_called_once_with(
+        bucket="obfuscator-tool-bucket",
+        file_name="test_file.csv",
+        pii_fields=[],
+        detect_pii=True
+    )
+
+
 @patch("gdpr_obfuscator.csv_handler.csv_processor")
 def test_lambda_handler_exception(mock_processor):
     mock_processor.side_effect = Exception("Processing error")
@@ -143,6 +187,45 @@ def test_lambda_handler_exception(mock_processor):
         csv_handler.lambda_handler(event, None)
 
 
+@patch("gdpr_obfuscator.csv_handler.csv_processor")
+def test_lambda_handler_dispatcher_payload(mock_processor):
+    mock_processor.return_value = {"statusCode": 200, "body": "OK"}
+
+    event = {
+        "bucket": "obfuscator-tool-bucket",
+        "file_name": "test_file.csv",
+        "pii_fields": ["name"],
+        "detect_pii": True
+    }
+
+    csv_handler.lambda_handler(event, None)
+
+    mock_processor.assert_called_once_with(
+        bucket="obfuscator-tool-bucket",
+        file_name="test_file.csv",
+        pii_fields=["name"],
+        detect_pii=True
+    )
+
+
+@patch("gdpr_obfuscator.csv_handler.csv_processor")
+@patch("gdpr_obfuscator.csv_handler.dry_run_response")
+def test_lambda_handler_dry_run(mock_dry_run, mock_processor):
+    mock_dry_run.return_value = {"statusCode": 200, "body": "{}"}
+
+    event = {
+        "file_to_obfuscate": "s3://obfuscator-tool-bucket/test_file.csv",
+        "pii_fields": ["name"],
+        "dry_run": True
+    }
+
+    result = csv_handler.lambda_handler(event, None)
+
+    mock_dry_run.assert_called_once_with("obfuscator-tool-bucket", "test_file.csv", ["name"], False)
+    mock_processor.assert_not_called()
+    assert result["statusCode"] == 200
+
+
 def test_lambda_handler_invalid_event_structure():
     bad_event = {}  # Missing 'Records'
 
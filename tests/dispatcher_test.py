@@ -137,3 +137,33 @@ def test_lambda_handler_invocation_failure(mock_invoke):
 
     assert response['statusCode'] == 500
     assert "Error invoking Lambda function" in response['body']
+
+
+@patch('gdpr_obfuscator.dispatcher.lambda_client.invoke')
+def test_lambda_handler_forwards_pii_options(mock_invoke):
+    mock_invoke.return_value = {'StatusCode': 202}
+
+    event = {
+        "Records": [{
+            "s3": {
+                "bucket": {"name": "test-bucket"},
+                "object": {"key": "file.csv"}
+            }
+        }],
+        "pii_fields": ["name", "email"],
+        "detect_pii": True
+    }
+
+    response = dispatcher.lambda_handler(event, None)
+
+    mock_invoke.assert_called_once_with(
+        FunctionName='csv_processor',
+        InvocationType='Event',
+        Payload=json.dumps({
+            'bucket': 'test-bucket',
+            'file_name': 'file.csv',
+            'pii_fields': ['name', 'email'],
+            'detect_pii': True
+        })
+    )
+    assert response['statusCode'] == 202
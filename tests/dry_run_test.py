@@ -0,0 +1,160 @@
+import io
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from unittest.mock import patch
+from gdpr_obfuscator import dry_run
+from gdpr_obfuscator.obfuscation_utils import obfuscate_table
+
+
+class RangeS3:
+    """In-memory stand-in for head_object and ranged get_object that records bytes served."""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.bytes_served = 0
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(part) for part in Range.replace("bytes=", "").split("-"))
+        data = self.objects[Key][start:end + 1]
+        self.bytes_served += len(data)
+        return {"Body": io.BytesIO(data)}
+
+
+def large_csv(rows):
+    df = pd.DataFrame({
+        "name": [f"Person {i}" for i in range(rows)],
+        "email": [f"person{i}@example.com" for i in range(rows)],
+        "amount": range(rows),
+    })
+    return df.to_csv(index=False).encode("utf-8")
+
+
+# ==========================
+# Tests for plan_file
+# ==========================
+
+def test_plan_csv_reads_only_head():
+    body = large_csv(20_000)
+    fake_s3 = RangeS3({"big.csv": body})
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", "big.csv", ["name", "phone"], detect_pii=True)
+
+    assert fake_s3.bytes_served == dry_run.HEAD_BYTES < len(body)
+    assert plan["matched_fields"] == ["name"]
+    assert plan["missing_fields"] == ["phone"]
+    assert plan["detected_fields"] == {"email": "email"}
+    assert plan["rows_estimated"] is True
+    assert 17_000 < plan["rows"] < 23_000
+    assert plan["chunking"]["strategy"] == "shards"
+    assert plan["suggested_lambda_memory_mb"] >= plan["estimated_memory_mb"]
+
+
+def test_plan_csv_header_wider_than_head():
+    columns = [f"column_{i}" for i in range(20_000)]
+    body = (",".join(columns) + "\n" + ",".join("x" for _ in columns) + "\n").encode("utf-8")
+    fake_s3 = RangeS3({"wide.csv": body})
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", "wide.csv", ["column_19999", "email"])
+
+    assert len(body) > dry_run.HEAD_BYTES
+    assert plan["rows"] == 1
+    assert plan["matched_fields"] == ["column_19999"]
+    assert plan["missing_fields"] == ["email"]
+
+
+@pytest.mark.parametrize("file_name", ["empty.csv", "empty.json"])
+def test_plan_empty_object(file_name):
+    fake_s3 = RangeS3({file_name: b""})
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", file_name, ["email"])
+
+    assert plan["rows"] == 0
+    assert plan["rows_estimated"] is False
+    assert plan["missing_fields"] == ["email"]
+    assert fake_s3.bytes_served == 0
+
+
+def test_plan_small_csv_counts_rows_exactly():
+    fake_s3 = RangeS3({"small.csv": large_csv(10)})
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", "small.csv", {"email": "email"})
+
+    assert plan["rows"] == 10
+    assert plan["rows_estimated"] is False
+    assert plan["matched_fields"] == ["email"]
+
+
+def test_plan_json_parses_truncated_head():
+    records = [{"name": f"Person {i}", "email": f"p{i}@example.com"} for i in range(5_000)]
+    body = json.dumps(records, indent=2).encode("utf-8")
+    fake_s3 = RangeS3({"data/big.json": body})
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", "data/big.json", ["email", "address"])
+
+    assert fake_s3.bytes_served == dry_run.HEAD_BYTES
+    assert plan["matched_fields"] == ["email"]
+    assert plan["missing_fields"] == ["address"]
+    assert 4_500 < plan["rows"] < 5_500
+
+
+def test_plan_parquet_reads_only_footer():
+    table = pa.table({
+        "id": range(50_000),
+        "customer": pa.array([{"email": f"p{i}@example.com"} for i in range(50_000)]),
+        "notes": [f"note {i} " * 5 for i in range(50_000)],
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=20_000)
+    body = buffer.getvalue()
+    fake_s3 = RangeS3({"events.parquet": body})
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", "events.parquet", ["customer.email", "customer.phone"])
+
+    assert fake_s3.bytes_served < len(body) / 10
+    assert plan["bytes_read"] == fake_s3.bytes_served
+    assert plan["rows"] == 50_000
+    assert plan["chunking"] == {"strategy": "row_groups", "chunks": 3, "rows_per_chunk": [20_000, 20_000, 10_000]}
+    assert plan["matched_fields"] == ["customer.email"]
+    assert plan["missing_fields"] == ["customer.phone"]
+
+
+@pytest.mark.parametrize("compliant_nested_type", [True, False])
+def test_plan_parquet_fields_match_real_run(compliant_nested_type):
+    table = pa.table({
+        "item": ["pen"],
+        "list": ["a, b"],
+        "order": pa.array([{"item": "book", "buyer": "john@example.com"}]),
+        "contacts": pa.array([[{"phone": "07700900123"}]]),
+        "attributes": pa.array([[("email", "jo@x.org")]], type=pa.map_(pa.string(), pa.string())),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, use_compliant_nested_type=compliant_nested_type)
+    fake_s3 = RangeS3({"orders.parquet": buffer.getvalue()})
+    fields = ["item", "list", "order.item", "contacts.phone", "attributes.key", "contacts.element", "order.list"]
+
+    with patch("gdpr_obfuscator.dry_run.s3", fake_s3):
+        plan = dry_run.plan_file("bucket", "orders.parquet", fields)
+
+    assert plan["matched_fields"] == ["item", "list", "order.item", "contacts.phone", "attributes.key"]
+    assert plan["missing_fields"] == ["contacts.element", "order.list"]
+    for field in plan["matched_fields"]:
+        assert not obfuscate_table(table, [field]).equals(table)
+    for field in plan["missing_fields"]:
+        assert obfuscate_table(table, [field]).equals(table)
+
+
+def test_plan_unsupported_type():
+    with pytest.raises(ValueError, match="Unsupported file type: txt"):
+        dry_run.plan_file("bucket", "notes.txt", ["name"])
@@ -28,6 +28,26 @@ def test_json_processor_valid(mock_s3):
     assert "obfuscated" in response["body"]
 
 
+@patch("gdpr_obfuscator.json_handler.s3")
+def test_json_processor_null_strategy_writes_valid_json(mock_s3):
+    test_data = [{"name": "John", "age": 30}, {"name": "Jane", "nickname": "JJ"}]
+    mock_body = io.BytesIO(json.dumps(test_data).encode("utf-8"))
+    mock_s3.get_object.return_value = {"Body": mock_body}
+
+    json_handler.json_processor(
+        bucket="obfuscator-tool-bucket",
+        file_name="sample.json",
+        pii_fields={"name": "null"}
+    )
+
+    body = mock_s3.put_object.call_args.kwargs["Body"].decode("utf-8")
+    assert "NaN" not in body
+    assert json.loads(body) == [
+        {"name": None, "age": 30.0, "nickname": None},
+        {"name": None, "age": None, "nickname": "JJ"},
+    ]
+
+
 @patch("gdpr_obfuscator.json_handler.s3")
 def test_json_processor_missing_pii_fields(mock_s3):
     test_data = [{"name": "John", "age": 30}]
@@ -123,7 +143,8 @@ def test_lambda_handler_success(mock_processor):
     mock_processor.assert_called_once_with(
         bucket="obfuscator-tool-bucket",
         file_name="test_file.json",
-        pii_fields=["name", "email"]
+        pii_fields=["name", "email"],
+        detect_pii=False
     )
     assert result["statusCode"] == 200
 
@@ -146,7 +167,8 @@ def test_lambda_handler_defaults_pii_fields(mock_processor):
     mock_processor.assert_called_once_with(
         bucket="obfuscator-tool-bucket",
         file_name="test_file.json",
-        pii_fields=[]
+        pii_fields=[],
+        detect_pii=False
     )
     assert result["statusCode"] == 200
 
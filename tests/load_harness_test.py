@@ -0,0 +1,51 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from benchmarks import load_harness
+
+
+# ==========================
+# Tests for run_burst
+# ==========================
+
+@pytest.mark.parametrize("mode", load_harness.MODES)
+def test_run_burst_smoke(mode):
+    report = load_harness.run_burst(
+        mode=mode, events=6, concurrency=3, cold_start_ms=0, rows=5, batch_size=4, s3_latency_ms=0
+    )
+
+    assert report["completed"] == 6
+    assert report["errors"] == 0
+    assert report["latency_ms"]["p50"] is not None
+
+
+def test_print_report_when_every_event_fails(capsys):
+    report = load_harness.run_burst(
+        mode="dispatcher", events=4, concurrency=2, cold_start_ms=0, rows=5, formats=("txt",), s3_latency_ms=0
+    )
+
+    load_harness.print_report(report)
+
+    assert report["errors"] == 4
+    assert report["latency_ms"] == {"p50": None, "p95": None, "p99": None, "max": None}
+    output = capsys.readouterr().out
+    assert output.splitlines()[0].split()[:7] == ["dispatcher", "4", "2", "0.0", "-", "-", "-"]
+
+
+def test_run_burst_direct_mode_records_unroutable_files():
+    report = load_harness.run_burst(
+        mode="direct", events=3, concurrency=2, cold_start_ms=0, rows=5, formats=("txt",), s3_latency_ms=0
+    )
+
+    assert report["errors"] == 3
+    assert report["invocations"] == 0
+
+
+def test_run_burst_queue_mode_uses_one_worker_per_invocation():
+    with patch("gdpr_obfuscator.queue_consumer.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as mock_pool:
+        report = load_harness.run_burst(
+            mode="queue", events=8, concurrency=2, cold_start_ms=0, rows=5, batch_size=4, s3_latency_ms=0
+        )
+
+    assert report["completed"] == 8
+    assert {call.kwargs["max_workers"] for call in mock_pool.call_args_list} == {1}
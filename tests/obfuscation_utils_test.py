@@ -0,0 +1,288 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+from gdpr_obfuscator import obfuscation_utils
+
+
+# ==========================
+# Tests for mask_kernel
+# ==========================
+
+def test_mask_kernel_preserves_length_and_nulls():
+    result = obfuscation_utils.mask_kernel(pa.array(["John", None, "héllo"]))
+
+    assert result.to_pylist() == ["****", None, "*****"]
+
+
+def test_mask_kernel_stringifies_non_text():
+    result = obfuscation_utils.mask_kernel(pd.Series([30, 1234]))
+
+    assert result.to_pylist() == ["**", "****"]
+
+
+# ==========================
+# Tests for scrub_kernel
+# ==========================
+
+def test_scrub_kernel_masks_embedded_pii_only():
+    notes = pa.array([
+        "Contact john@example.com after 5pm",
+        "Call +44 7700 900123 or (020) 7946 0018",
+        "Delivered to SW1A 1AA on 2024-01-15",
+        "Refund to GB82 WEST 1234 5698 7654 32",
+        "No personal data here",
+        None,
+    ])
+
+    result = obfuscation_utils.scrub_kernel(notes).to_pylist()
+
+    assert result == [
+        "Contact [REDACTED] after 5pm",
+        "Call [REDACTED] or [REDACTED]",
+        "Delivered to [REDACTED] on 2024-01-15",
+        "Refund to [REDACTED]",
+        "No personal data here",
+        None,
+    ]
+
+
+def test_scrub_kernel_keeps_numeric_ids_and_dates():
+    notes = pa.array([
+        "Order 12345678 shipped",
+        "Version 1.2.3 build 20240115",
+        "Invoice 2024-001-0001",
+        "Ref 0123456789 due 2024-01-15",
+    ])
+
+    assert obfuscation_utils.scrub_kernel(notes).to_pylist() == notes.to_pylist()
+
+
+def test_scrub_kernel_phone_formats_and_lowercase_postcodes():
+    notes = pa.array([
+        "Call 07700900123 or 0044 20 7946 0958",
+        "Ship to sw1a 1aa by Friday",
+    ])
+
+    result = obfuscation_utils.scrub_kernel(notes).to_pylist()
+
+    assert result == ["Call [REDACTED] or [REDACTED]", "Ship to [REDACTED] by Friday"]
+
+
+def test_scrub_kernel_dictionary_terms():
+    notes = pa.array(["Spoke to Alice and BOB today", "Alicetown office"])
+
+    result = obfuscation_utils.scrub_kernel(notes, terms=("alice", "bob")).to_pylist()
+
+    assert result == ["Spoke to [REDACTED] and [REDACTED] today", "Alicetown office"]
+
+
+# ==========================
+# Tests for obfuscate_dataframe
+# ==========================
+
+def test_obfuscate_dataframe_list_uses_mask():
+    df = pd.DataFrame({"name": ["John", None], "age": [30, 40]}, index=[5, 7])
+
+    obfuscation_utils.obfuscate_dataframe(df, ["name", "missing"])
+
+    assert df["name"].tolist()[0] == "****"
+    assert pd.isna(df["name"].tolist()[1])
+    assert df["age"].tolist() == [30, 40]
+
+
+def test_obfuscate_dataframe_strategy_mapping():
+    df = pd.DataFrame({"name": ["John"], "notes": ["email john@example.com"]})
+
+    obfuscation_utils.obfuscate_dataframe(df, {"name": "mask", "notes": "scrub"})
+
+    assert df.to_dict(orient="records") == [{"name": "****", "notes": "email [REDACTED]"}]
+
+
+def test_obfuscate_dataframe_unknown_strategy():
+    df = pd.DataFrame({"name": ["John"]})
+
+    with pytest.raises(ValueError, match="Unknown obfuscation strategy 'shuffle'"):
+        obfuscation_utils.obfuscate_dataframe(df, {"name": "shuffle"})
+
+
+def test_obfuscate_dataframe_unknown_strategy_param():
+    df = pd.DataFrame({"name": ["John"]})
+
+    with pytest.raises(ValueError, match="Unknown parameter\\(s\\) n for obfuscation strategy 'mask'"):
+        obfuscation_utils.obfuscate_dataframe(df, {"name": {"strategy": "mask", "n": 3}})
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"strategy": "keep_last", "n": "4"}, "Invalid value '4' for parameter n of obfuscation strategy 'keep_last'"),
+    ({"strategy": "fixed_mask", "width": "8"}, "Invalid value '8' for parameter width"),
+    ({"strategy": "keep_last", "n": True}, "Invalid value True for parameter n"),
+    ({"strategy": "scrub", "terms": "alice"}, "Invalid value 'alice' for parameter terms"),
+])
+def test_obfuscate_dataframe_invalid_strategy_param_type(spec, message):
+    df = pd.DataFrame({"name": ["John"]})
+
+    with pytest.raises(ValueError, match=message):
+        obfuscation_utils.obfuscate_dataframe(df, {"name": spec})
+
+
+# ==========================
+# Tests for strategy library
+# ==========================
+
+def test_fixed_mask_kernel_hides_length():
+    result = obfuscation_utils.fixed_mask_kernel(pa.array(["Jo", "Alexandra", None]), width=6)
+
+    assert result.to_pylist() == ["******", "******", None]
+
+
+def test_keep_last_kernel():
+    values = pa.array(["4111111111111111", "123", None])
+
+    result = obfuscation_utils.keep_last_kernel(values, n=4)
+
+    assert result.to_pylist() == ["************1111", "***", None]
+
+
+@pytest.mark.parametrize("n", [0, -2])
+def test_keep_last_kernel_rejects_non_positive_n(n):
+    with pytest.raises(ValueError, match="keep_last needs n of at least 1"):
+        obfuscation_utils.keep_last_kernel(pa.array(["4111111111111111"]), n=n)
+
+
+def test_email_kernel_preserves_domain():
+    values = pa.array(["jane.doe@example.com", "not-an-email", None])
+
+    result = obfuscation_utils.email_kernel(values)
+
+    assert result.to_pylist() == ["********@example.com", "************", None]
+
+
+def test_null_kernel_keeps_type():
+    result = obfuscation_utils.null_kernel(pa.array([1, 2, 3]))
+
+    assert result.type == pa.int64()
+    assert result.to_pylist() == [None, None, None]
+
+
+def test_null_kernel_mixed_types():
+    result = obfuscation_utils.null_kernel(pd.Series([1, "a", None]))
+
+    assert result.to_pylist() == [None, None, None]
+
+
+def test_truncate_date_kernel_strings():
+    values = pa.array(["2024-03-09", "2024-12-31T23:59:00Z", "unknown", None])
+
+    result = obfuscation_utils.truncate_date_kernel(values, unit="month")
+
+    assert result.to_pylist() == ["2024-03-01", "2024-12-01", None, None]
+
+
+def test_truncate_date_kernel_timestamps():
+    values = pd.Series(pd.to_datetime(["2024-03-09 10:30", "2023-07-01 00:00"]))
+
+    result = obfuscation_utils.truncate_date_kernel(values, unit="year")
+
+    assert pa.types.is_timestamp(result.type)
+    assert [value.year for value in result.to_pylist()] == [2024, 2023]
+    assert all(value.month == 1 and value.day == 1 for value in result.to_pylist())
+
+
+def test_obfuscate_dataframe_strategy_params():
+    df = pd.DataFrame({"card": ["4111111111111111"], "email": ["jane@example.com"]})
+
+    obfuscation_utils.obfuscate_dataframe(df, {
+        "card": {"strategy": "keep_last", "n": 2},
+        "email": {"strategy": "email", "width": 3}
+    })
+
+    assert df.to_dict(orient="records") == [{"card": "**************11", "email": "***@example.com"}]
+
+
+# ==========================
+# Tests for nested columns
+# ==========================
+
+NESTED_TABLE = pa.table({
+    "id": [1, 2, 3],
+    "customer": pa.array([
+        {"name": "John", "email": "john@example.com"},
+        None,
+        {"name": None, "email": "alice@example.org"},
+    ]),
+    "contacts": pa.array([
+        [{"phone": "07700900123", "kind": "mobile"}],
+        None,
+        [{"phone": "02079460018", "kind": "home"}, None, {"phone": None, "kind": "work"}],
+    ]),
+    "aliases": pa.array([["Johnny"], [], None]),
+})
+
+
+def test_obfuscate_table_struct_path():
+    result = obfuscation_utils.obfuscate_table(NESTED_TABLE, {"customer.email": "email"})
+
+    assert result.column("customer").to_pylist() == [
+        {"name": "John", "email": "********@example.com"},
+        None,
+        {"name": None, "email": "********@example.org"},
+    ]
+    assert result.column("contacts") == NESTED_TABLE.column("contacts")
+
+
+def test_obfuscate_table_list_of_struct_path():
+    result = obfuscation_utils.obfuscate_table(
+        NESTED_TABLE, {"contacts.phone": {"strategy": "keep_last", "n": 3}}
+    )
+
+    assert result.column("contacts").to_pylist() == [
+        [{"phone": "********123", "kind": "mobile"}],
+        None,
+        [{"phone": "********018", "kind": "home"}, None, {"phone": None, "kind": "work"}],
+    ]
+
+
+def test_obfuscate_table_whole_nested_column_masks_leaves():
+    result = obfuscation_utils.obfuscate_table(NESTED_TABLE.slice(1), ["customer", "aliases"])
+
+    assert result.column("customer").to_pylist() == [None, {"name": None, "email": "*****************"}]
+    assert result.column("aliases").to_pylist() == [[], None]
+
+
+def test_obfuscate_table_missing_nested_path_is_ignored():
+    result = obfuscation_utils.obfuscate_table(NESTED_TABLE, ["customer.phone", "unknown.email"])
+
+    assert result.equals(NESTED_TABLE)
+
+
+MAP_TABLE = pa.table({
+    "attributes": pa.array(
+        [[("email", "john@example.com"), ("city", "Leeds")], None, [("email", "jo@x.org")]],
+        type=pa.map_(pa.string(), pa.string()),
+    ),
+    "scores": pa.array([["ab", "c"], None, ["de", "f"]], type=pa.list_(pa.string(), 2)),
+})
+
+
+def test_obfuscate_table_map_values_and_keys():
+    values = obfuscation_utils.obfuscate_table(MAP_TABLE.slice(1), ["attributes"])
+    keys = obfuscation_utils.obfuscate_table(MAP_TABLE, ["attributes.key"])
+
+    assert values.column("attributes").to_pylist() == [None, [("email", "********")]]
+    assert keys.column("attributes").to_pylist() == [
+        [("*****", "john@example.com"), ("****", "Leeds")], None, [("*****", "jo@x.org")],
+    ]
+
+
+def test_obfuscate_table_fixed_size_list():
+    result = obfuscation_utils.obfuscate_table(MAP_TABLE.slice(1), ["scores"])
+
+    assert result.column("scores").type == pa.list_(pa.string(), 2)
+    assert result.column("scores").to_pylist() == [None, ["**", "*"]]
+
+
+def test_obfuscate_table_unsupported_nested_type():
+    union = pa.UnionArray.from_sparse(pa.array([0, 1], type=pa.int8()), [pa.array(["a", "b"]), pa.array([1, 2])])
+
+    with pytest.raises(ValueError, match="Unsupported nested column type"):
+        obfuscation_utils.obfuscate_table(pa.table({"value": union}), ["value"])
@@ -1,8 +1,11 @@
 import io
 import pytest
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from unittest.mock import patch, MagicMock
-from gdpr_obfuscator import parquet_handler
+from gdpr_obfuscator import parquet_handler, pii_detector
+from gdpr_obfuscator.pii_detector import resolve_pii_fields
 from botocore.exceptions import ClientError
 
 
@@ -51,6 +54,137 @@ def test_parquet_processor_missing_pii_fields(mock_s3):
     assert "processed and uploaded" in response["body"]
 
 
+@patch("gdpr_obfuscator.parquet_handler.s3")
+def test_parquet_processor_preserves_layout(mock_s3):
+    table = pa.table({
+        "name": ["John", "Alice", "Oliver", None],
+        "email": ["john@example.com", "alice@example.com", "oliver@example.com", "x@example.com"],
+        "age": [30, 25, 41, 52],
+    })
+    buffer = io.BytesIO()
+    pq.write_table(
+        table,
+        buffer,
+        row_group_size=2,
+        compression={"name": "gzip", "email": "zstd", "age": "snappy"},
+        use_dictionary=["age"]
+    )
+    mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+    parquet_handler.parquet_processor(
+        bucket="obfuscator-tool-bucket",
+        file_name="sample.parquet",
+        pii_fields={"name": "mask", "email": "email"}
+    )
+
+    output = pq.ParquetFile(io.BytesIO(mock_s3.put_object.call_args.kwargs["Body"]))
+    metadata = output.metadata
+    assert metadata.num_row_groups == 2
+    columns = [metadata.row_group(0).column(i) for i in range(metadata.num_columns)]
+    assert [column.compression for column in columns] == ["GZIP", "ZSTD", "SNAPPY"]
+    assert any("DICTIONARY" in encoding for encoding in columns[2].encodings)
+    assert not any("DICTIONARY" in encoding for encoding in columns[0].encodings)
+
+    result = output.read()
+    assert result.column("name").to_pylist() == ["****", "*****", "******", None]
+    assert result.column("email").to_pylist()[0] == "********@example.com"
+    assert result.column("age") == table.column("age")
+
+
+@patch("gdpr_obfuscator.parquet_handler.s3")
+def test_parquet_processor_masks_non_string_column(mock_s3):
+    df = pd.DataFrame({"name": ["John"], "phone": [7700900123]})
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+    parquet_handler.parquet_processor(
+        bucket="obfuscator-tool-bucket",
+        file_name="sample.parquet",
+        pii_fields=["phone"]
+    )
+
+    result = pd.read_parquet(io.BytesIO(mock_s3.put_object.call_args.kwargs["Body"]))
+    assert result.to_dict(orient="records") == [{"name": "John", "phone": "**********"}]
+
+
+@pytest.mark.parametrize("compliant_nested_type", [True, False])
+@patch("gdpr_obfuscator.parquet_handler.s3")
+def test_parquet_processor_nested_fields(mock_s3, compliant_nested_type):
+    table = pa.table({
+        "id": [1, 2],
+        "customer": pa.array([{"email": "john@example.com", "age": 30}, None]),
+        "contacts": pa.array([[{"phone": "07700900123"}], None]),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd", use_compliant_nested_type=compliant_nested_type)
+    mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+    parquet_handler.parquet_processor(
+        bucket="obfuscator-tool-bucket",
+        file_name="nested.parquet",
+        pii_fields={"customer.email": "email", "contacts.phone": "mask"}
+    )
+
+    output = pq.ParquetFile(io.BytesIO(mock_s3.put_object.call_args.kwargs["Body"]))
+    assert output.read().to_pylist() == [
+        {"id": 1, "customer": {"email": "********@example.com", "age": 30}, "contacts": [{"phone": "***********"}]},
+        {"id": 2, "customer": None, "contacts": None},
+    ]
+    row_group = output.metadata.row_group(0)
+    assert {row_group.column(i).compression for i in range(row_group.num_columns)} == {"ZSTD"}
+
+
+@patch("gdpr_obfuscator.parquet_handler.s3")
+def test_parquet_processor_map_column(mock_s3):
+    table = pa.table({
+        "id": [1, 2],
+        "attributes": pa.array([[("email", "john@example.com")], None], type=pa.map_(pa.string(), pa.string())),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+    parquet_handler.parquet_processor(
+        bucket="obfuscator-tool-bucket",
+        file_name="map.parquet",
+        pii_fields=["attributes"]
+    )
+
+    output = pq.read_table(io.BytesIO(mock_s3.put_object.call_args.kwargs["Body"]))
+    assert output.to_pylist() == [
+        {"id": 1, "attributes": [("email", "****************")]},
+        {"id": 2, "attributes": None},
+    ]
+
+
+@patch("gdpr_obfuscator.parquet_handler.s3")
+def test_parquet_processor_detect_pii_reads_bounded_sample(mock_s3):
+    pii_detector._detection_cache.clear()
+    table = pa.table({
+        "contact": [f"person{i}@example.com" for i in range(5_000)],
+        "amount": range(5_000),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+    with patch("gdpr_obfuscator.parquet_handler.resolve_pii_fields", wraps=resolve_pii_fields) as mock_resolve:
+        parquet_handler.parquet_processor(
+            bucket="obfuscator-tool-bucket",
+            file_name="detect.parquet",
+            pii_fields=[],
+            detect_pii=True
+        )
+    pii_detector._detection_cache.clear()
+
+    sample = mock_resolve.call_args.args[0]
+    assert len(sample) == pii_detector.SAMPLE_SIZE * pii_detector.SAMPLE_SCAN_FACTOR
+    output = pq.read_table(io.BytesIO(mock_s3.put_object.call_args.kwargs["Body"]))
+    assert output.column("contact")[0].as_py() == "*" * len("person0@example.com")
+    assert output.column("amount") == table.column("amount")
+
+
 @patch("gdpr_obfuscator.parquet_handler.s3")
 def test_parquet_processor_s3_error(mock_s3):
     mock_s3.get_object.side_effect = ClientError(
@@ -103,7 +237,8 @@ def test_lambda_handler_success(mock_processor):
     mock_processor.assert_called_once_with(
         bucket="obfuscator-tool-bucket",
         file_name="test_file.parquet",
-        pii_fields=["name", "email"]
+        pii_fields=["name", "email"],
+        detect_pii=False
     )
 
     assert result["statusCode"] == 200
@@ -127,7 +262,8 @@ def test_lambda_handler_default_pii_fields(mock_processor):
     mock_processor.assert_called_once_with(
         bucket="obfuscator-tool-bucket",
         file_name="test_file.parquet",
-        pii_fields=[]
+        pii_fields=[],
+        detect_pii=False
     )
     assert result["statusCode"] == 200
 
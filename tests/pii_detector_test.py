@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from gdpr_obfuscator import pii_detector
+
+
+@pytest.fixture(autouse=True)
+def clear_detection_cache():
+    pii_detector._detection_cache.clear()
+    yield
+    pii_detector._detection_cache.clear()
+
+
+# ==========================
+# Tests for detect_pii_columns
+# ==========================
+
+def test_detect_pii_columns_finds_known_kinds():
+    df = pd.DataFrame({
+        "full_name": ["John Smith", "Alice Jones", "Oliver Brown"],
+        "contact": ["john@example.com", "alice@example.co.uk", "oliver@test.org"],
+        "mobile": ["+44 7700 900123", "07700 900456", "(020) 7946 0018"],
+        "account": ["GB82 WEST 1234 5698 7654 32", "DE89370400440532013000", "GB29NWBK60161331926819"],
+        "postcode": ["SW1A 1AA", "M1 1AE", "b33 8th"],
+        "age": [30, 41, 22],
+        "product": ["widget", "gadget", "gizmo"],
+    })
+
+    detected = pii_detector.detect_pii_columns(df)
+
+    assert detected == {
+        "full_name": "name",
+        "contact": "email",
+        "mobile": "phone",
+        "account": "iban",
+        "postcode": "postcode",
+    }
+
+
+def test_detect_pii_columns_ignores_low_match_ratio():
+    df = pd.DataFrame({"notes": ["john@example.com", "n/a", "call back", "none"]})
+
+    assert pii_detector.detect_pii_columns(df) == {}
+
+
+def test_detect_pii_columns_ignores_dates_and_numeric_ids():
+    df = pd.DataFrame({
+        "signup_date": ["2024-01-15", "2023-11-02", "2024-06-30"],
+        "signup_time": ["2024-01-15 09:30:00", "2023-11-02 17:45:12", "2024-06-30 00:00:00"],
+        "order_id": ["10023456", "10023457", "1002345899"],
+        "reference": ["00012345", "00012346", "00012347"],
+        "account_ref": ["0123456789", "0123456790", "0123456791"],
+        "member_no": ["0012345678", "0012345679", "0012345680"],
+        "customer_ref": ["07700900123", "07700900124", "07700900125"],
+    })
+
+    assert pii_detector.detect_pii_columns(df) == {}
+
+
+def test_detect_pii_columns_finds_unseparated_phones():
+    df = pd.DataFrame({
+        "phone": ["07700900123", "02079460018", "+447700900456"],
+        "home_tel": ["02079460018", "01134960000", "02079460019"],
+    })
+
+    assert pii_detector.detect_pii_columns(df) == {"phone": "phone", "home_tel": "phone"}
+
+
+def test_detect_pii_columns_only_inspects_sample():
+    emails = ["person@example.com"] * 10
+    df = pd.DataFrame({"value": emails + ["not pii"] * 1000})
+
+    assert pii_detector.detect_pii_columns(df, sample_size=10) == {"value": "email"}
+
+
+def test_detect_pii_columns_bounds_rows_scanned():
+    df = pd.DataFrame({"value": [None] * 100 + ["person@example.com"] * 1000}, dtype=object)
+
+    assert pii_detector.detect_pii_columns(df, sample_size=10) == {}
+
+
+def test_detect_pii_columns_caches_by_schema():
+    first = pd.DataFrame({"contact": ["a@example.com"], "id": ["x1"]})
+    second = pd.DataFrame({"contact": ["b@example.com"], "id": ["x2"]})
+
+    pii_detector.detect_pii_columns(first)
+
+    with patch("gdpr_obfuscator.pii_detector.detect_column") as mock_detect:
+        detected = pii_detector.detect_pii_columns(second)
+
+    mock_detect.assert_not_called()
+    assert detected == {"contact": "email"}
+
+
+def test_detect_pii_columns_does_not_cache_empty_sample():
+    empty = pd.DataFrame({"contact": pd.Series([], dtype=object)})
+    populated = pd.DataFrame({"contact": ["a@example.com"]})
+
+    assert pii_detector.detect_pii_columns(empty) == {}
+    assert pii_detector.detect_pii_columns(populated) == {"contact": "email"}
+
+
+def test_detect_pii_columns_does_not_cache_all_null_text_column():
+    sparse = pd.DataFrame({"id": ["1", "2"], "email": [None, None]}, dtype=object)
+    filled = pd.DataFrame({"id": ["3", "4"], "email": ["a@example.com", "b@example.com"]}, dtype=object)
+
+    assert pii_detector.detect_pii_columns(sparse) == {}
+    assert pii_detector.detect_pii_columns(filled) == {"email": "email"}
+
+
+# ==========================
+# Tests for resolve_pii_fields
+# ==========================
+
+def test_resolve_pii_fields_without_detection():
+    df = pd.DataFrame({"contact": ["a@example.com"]})
+
+    assert pii_detector.resolve_pii_fields(df, ["name"]) == ["name"]
+
+
+def test_resolve_pii_fields_merges_detected():
+    df = pd.DataFrame({"name": ["John Smith"], "contact": ["a@example.com"]})
+
+    fields = pii_detector.resolve_pii_fields(df, ["name"], detect_pii=True)
+
+    assert fields == ["name", "contact"]
@@ -0,0 +1,93 @@
+import pstats
+import pytest
+from unittest.mock import patch, MagicMock
+from gdpr_obfuscator import profiling
+
+
+@pytest.fixture(autouse=True)
+def clear_profile_env(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_ENV_VAR, raising=False)
+    monkeypatch.delenv(profiling.PROFILE_OUTPUT_ENV_VAR, raising=False)
+
+
+def sample_handler(event, context):
+    return {"statusCode": 200, "body": sum(range(1000))}
+
+
+# ==========================
+# Tests for profiling_enabled
+# ==========================
+
+def test_profiling_disabled_by_default():
+    assert profiling.profiling_enabled({}) is False
+
+
+def test_profiling_enabled_by_event_flag():
+    assert profiling.profiling_enabled({"profile": True}) is True
+
+
+def test_profiling_enabled_by_env(monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_ENV_VAR, "true")
+
+    assert profiling.profiling_enabled({}) is True
+
+
+# ==========================
+# Tests for profiled
+# ==========================
+
+@patch("gdpr_obfuscator.profiling.write_profile")
+def test_profiled_skips_when_disabled(mock_write):
+    handler = profiling.profiled(sample_handler)
+
+    assert handler({}, None) == {"statusCode": 200, "body": 499500}
+    mock_write.assert_not_called()
+
+
+def test_profiled_writes_local_reports(monkeypatch, tmp_path):
+    monkeypatch.setenv(profiling.PROFILE_OUTPUT_ENV_VAR, str(tmp_path))
+    context = MagicMock(aws_request_id="req-1")
+    handler = profiling.profiled(sample_handler)
+
+    result = handler({"profile": True}, context)
+
+    assert result["statusCode"] == 200
+    stats_files = list(tmp_path.glob("*_req-1.prof"))
+    allocation_files = list(tmp_path.glob("*_req-1.allocations.txt"))
+    assert len(stats_files) == 1 and len(allocation_files) == 1
+    assert "sample_handler" in str(pstats.Stats(str(stats_files[0])).stats)
+    assert "Peak traced memory" in allocation_files[0].read_text()
+
+
+@patch("gdpr_obfuscator.profiling.s3")
+def test_profiled_uploads_to_s3(mock_s3, monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_OUTPUT_ENV_VAR, "s3://profile-bucket/profiles/")
+    handler = profiling.profiled(sample_handler)
+
+    handler({"profile": True}, MagicMock(aws_request_id="req-2"))
+
+    keys = [call.kwargs["Key"] for call in mock_s3.put_object.call_args_list]
+    assert all(call.kwargs["Bucket"] == "profile-bucket" for call in mock_s3.put_object.call_args_list)
+    assert keys[0].endswith("_req-2.prof")
+    assert keys[1].endswith("_req-2.allocations.txt")
+    assert all(key.startswith("profiles/") for key in keys)
+
+
+@patch("gdpr_obfuscator.profiling.s3")
+def test_profiled_s3_output_leaves_no_local_files(mock_s3, monkeypatch, tmp_path):
+    monkeypatch.setenv(profiling.PROFILE_OUTPUT_ENV_VAR, "s3://profile-bucket/profiles/")
+    monkeypatch.setattr(profiling.tempfile, "tempdir", str(tmp_path))
+    handler = profiling.profiled(sample_handler)
+
+    handler({"profile": True}, MagicMock(aws_request_id="req-3"))
+
+    assert mock_s3.put_object.call_count == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@patch("gdpr_obfuscator.profiling.write_profile")
+def test_profiled_write_failure_does_not_fail_handler(mock_write):
+    mock_write.side_effect = OSError("read-only file system")
+    handler = profiling.profiled(sample_handler)
+
+    assert handler({"profile": True}, None)["statusCode"] == 200
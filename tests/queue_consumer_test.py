@@ -0,0 +1,101 @@
+import json
+import pytest
+from unittest.mock import patch
+from gdpr_obfuscator import queue_consumer
+
+
+def s3_notification(*keys, bucket="obfuscator-tool-bucket"):
+    return json.dumps({
+        "Records": [{"s3": {"bucket": {"name": bucket}, "object": {"key": key}}} for key in keys]
+    })
+
+
+# ==========================
+# Tests for parse_message
+# ==========================
+
+def test_parse_message_s3_notification(monkeypatch):
+    monkeypatch.setenv("PII_FIELDS", "name, email")
+
+    files = queue_consumer.parse_message(s3_notification("data/my+file.csv", "b.json"))
+
+    assert files == [
+        ("obfuscator-tool-bucket", "data/my file.csv", ["name", "email"], False),
+        ("obfuscator-tool-bucket", "b.json", ["name", "email"], False),
+    ]
+
+
+def test_parse_message_detect_pii_from_env(monkeypatch):
+    monkeypatch.setenv("PII_FIELDS", "name")
+    monkeypatch.setenv("DETECT_PII", "true")
+
+    files = queue_consumer.parse_message(s3_notification("a.csv"))
+
+    assert files == [("obfuscator-tool-bucket", "a.csv", ["name"], True)]
+
+
+def test_parse_message_handler_payload():
+    body = json.dumps({"file_to_obfuscate": "s3://bucket/a.parquet", "pii_fields": ["name"], "detect_pii": True})
+
+    assert queue_consumer.parse_message(body) == [("bucket", "a.parquet", ["name"], True)]
+
+
+def test_parse_message_test_event():
+    assert queue_consumer.parse_message(json.dumps({"Event": "s3:TestEvent"})) == []
+
+
+def test_parse_message_malformed():
+    with pytest.raises(KeyError):
+        queue_consumer.parse_message(json.dumps({"unexpected": True}))
+
+
+# ==========================
+# Tests for lambda_handler
+# ==========================
+
+@patch("gdpr_obfuscator.queue_consumer.process_object")
+def test_lambda_handler_reports_partial_failures(mock_process):
+    def process(bucket, file_name, pii_fields, detect_pii):
+        if file_name == "broken.csv":
+            raise ValueError("CSV file is malformed")
+        return {"statusCode": 200}
+
+    mock_process.side_effect = process
+    event = {"Records": [
+        {"messageId": "m1", "body": s3_notification("a.csv", "b.json")},
+        {"messageId": "m2", "body": s3_notification("broken.csv")},
+        {"messageId": "m3", "body": "not json"},
+        {"messageId": "m4", "body": s3_notification("c.parquet")},
+    ]}
+
+    response = queue_consumer.lambda_handler(event, None)
+
+    assert mock_process.call_count == 4
+    assert response == {"batchItemFailures": [{"itemIdentifier": "m2"}, {"itemIdentifier": "m3"}]}
+
+
+# ==========================
+# Tests for LocalQueue
+# ==========================
+
+@patch("gdpr_obfuscator.queue_consumer.process_object")
+def test_drain_queue_retries_only_failed_messages(mock_process):
+    attempts = {}
+
+    def process(bucket, file_name, pii_fields, detect_pii):
+        attempts[file_name] = attempts.get(file_name, 0) + 1
+        if file_name == "flaky.csv" and attempts[file_name] == 1:
+            raise ConnectionError("timeout")
+        if file_name == "broken.csv":
+            raise ValueError("malformed")
+
+    mock_process.side_effect = process
+    queue = queue_consumer.LocalQueue(max_receive_count=2)
+    for key in ["a.csv", "flaky.csv", "broken.csv", "b.csv", "c.csv"]:
+        queue.send_message(s3_notification(key))
+
+    stats = queue_consumer.drain_queue(queue, batch_size=10)
+
+    assert attempts == {"a.csv": 1, "flaky.csv": 2, "broken.csv": 2, "b.csv": 1, "c.csv": 1}
+    assert stats == {"invocations": 2, "delivered": 7, "dead_letters": 1}
+    assert json.loads(queue.dead_letters[0]["body"])["Records"][0]["s3"]["object"]["key"] == "broken.csv"
@@ -0,0 +1,23 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from gdpr_obfuscator import routing
+
+
+def test_process_object_routes_by_extension():
+    mock_processor = MagicMock(return_value={"statusCode": 200})
+
+    with patch.dict(routing.PROCESSORS, {"parquet": mock_processor}):
+        result = routing.process_object("source-bucket", "data/File.PARQUET", ["name"])
+
+    mock_processor.assert_called_once_with(
+        bucket="source-bucket",
+        file_name="data/File.PARQUET",
+        pii_fields=["name"],
+        detect_pii=False
+    )
+    assert result["statusCode"] == 200
+
+
+def test_process_object_unsupported_type():
+    with pytest.raises(ValueError, match="Unsupported file type: txt"):
+        routing.process_object("source-bucket", "notes.txt", ["name"])
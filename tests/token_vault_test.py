@@ -0,0 +1,135 @@
+import pyarrow as pa
+import pytest
+from unittest.mock import patch
+from gdpr_obfuscator import obfuscation_utils, token_vault
+
+
+@pytest.fixture
+def sqlite_vault(tmp_path):
+    vault = token_vault.SQLiteTokenVault(str(tmp_path / "vault.db"))
+    yield vault
+    vault.close()
+
+
+@pytest.fixture
+def default_vault(sqlite_vault):
+    vault = token_vault.CachedTokenVault(sqlite_vault)
+    token_vault.set_token_vault(vault)
+    yield vault
+    token_vault.set_token_vault(None)
+
+
+# ==========================
+# Tests for SQLiteTokenVault
+# ==========================
+
+def test_incomplete_vault_backend_fails_on_creation():
+    class LookupOnlyVault(token_vault.TokenVault):
+        def lookup(self, namespace, values):
+            return {}
+
+    with pytest.raises(TypeError, match="abstract"):
+        LookupOnlyVault()
+
+
+def test_sqlite_vault_tokens_are_stable(tmp_path):
+    path = str(tmp_path / "vault.db")
+    first = token_vault.SQLiteTokenVault(path)
+    tokens = first.tokenize("email", ["a@example.com", "b@example.com"])
+    first.close()
+
+    second = token_vault.SQLiteTokenVault(path)
+    assert second.tokenize("email", ["b@example.com", "a@example.com"]) == tokens[::-1]
+    assert all(token.startswith("tok_") for token in tokens)
+    assert tokens[0] != tokens[1]
+    second.close()
+
+
+def test_sqlite_vault_namespaces_are_separate(sqlite_vault):
+    email_token = sqlite_vault.tokenize("email", ["john"])[0]
+    name_token = sqlite_vault.tokenize("name", ["john"])[0]
+
+    assert email_token != name_token
+
+
+def test_sqlite_vault_insert_keeps_existing_token(sqlite_vault):
+    original = sqlite_vault.tokenize("email", ["a@example.com"])[0]
+
+    stored = sqlite_vault.insert("email", {"a@example.com": "tok_other"})
+
+    assert stored == {"a@example.com": original}
+
+
+def test_sqlite_vault_reverse_lookup_batches(sqlite_vault):
+    values = [f"user{i}@example.com" for i in range(1200)]
+    tokens = sqlite_vault.tokenize("email", values)
+
+    assert sqlite_vault.reverse_lookup("email", tokens) == dict(zip(tokens, values))
+
+
+# ==========================
+# Tests for CachedTokenVault
+# ==========================
+
+def test_cached_vault_only_sends_misses_to_backend(sqlite_vault):
+    vault = token_vault.CachedTokenVault(sqlite_vault, max_size=10)
+    vault.tokenize("email", ["a", "b"])
+
+    with patch.object(sqlite_vault, "tokenize", wraps=sqlite_vault.tokenize) as mock_tokenize:
+        vault.tokenize("email", ["a", "b", "c"])
+
+    mock_tokenize.assert_called_once_with("email", ["c"])
+
+
+def test_cached_vault_evicts_least_recently_used(sqlite_vault):
+    vault = token_vault.CachedTokenVault(sqlite_vault, max_size=2)
+    vault.tokenize("email", ["a", "b"])
+    vault.tokenize("email", ["a"])
+    vault.tokenize("email", ["c"])
+
+    assert list(vault._cache) == [("email", "a"), ("email", "c")]
+
+
+# ==========================
+# Tests for tokenize_kernel
+# ==========================
+
+def test_get_token_vault_requires_configuration():
+    token_vault.set_token_vault(None)
+
+    with patch.dict("os.environ", {}, clear=True):
+        with pytest.raises(RuntimeError, match="No token vault configured"):
+            token_vault.get_token_vault()
+
+
+def test_get_token_vault_uses_configured_path(tmp_path):
+    token_vault.set_token_vault(None)
+    path = str(tmp_path / "vault.db")
+
+    with patch.dict("os.environ", {"TOKEN_VAULT_PATH": path}):
+        vault = token_vault.get_token_vault()
+
+    assert vault.backend.path == path
+    vault.backend.close()
+    token_vault.set_token_vault(None)
+
+
+def test_tokenize_kernel_consistent_pseudonyms(default_vault):
+    values = pa.chunked_array([["a@example.com", None], ["b@example.com", "a@example.com"]])
+
+    result = obfuscation_utils.tokenize_kernel(values, namespace="email").to_pylist()
+    again = obfuscation_utils.tokenize_kernel(pa.array(["b@example.com"]), namespace="email").to_pylist()
+
+    assert result[0] == result[3]
+    assert result[1] is None
+    assert again == [result[2]]
+    assert default_vault.reverse_lookup("email", [result[0]]) == {result[0]: "a@example.com"}
+
+
+def test_tokenize_kernel_looks_up_distinct_values_once(default_vault):
+    values = pa.array(["a", "b"] * 500)
+
+    with patch.object(default_vault, "tokenize", wraps=default_vault.tokenize) as mock_tokenize:
+        obfuscation_utils.tokenize_kernel(values)
+
+    mock_tokenize.assert_called_once_with("default", ["a", "b"])